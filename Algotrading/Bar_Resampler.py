@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+
+BAR_COLUMNS = ["High", "Low", "Open", "Close", "Volume", "Adj Close"]
+
+##########################################################################################################################################################################################################################
+
+#Tick Sources
+
+def _tick_chunks(source, chunksize, time_col, price_col, size_col):
+
+    """Intakes a tick source, i.e. the path of a CSV or Parquet file or an iterable of tick dataframes, and yields it in
+    chunks of (timestamps as datetime64[ns], prices, sizes) arrays"""
+
+    if isinstance(source, str):
+        if source.endswith(".parquet"):
+            import pyarrow.parquet as pq
+            frames = (batch.to_pandas() for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize,
+                                                                                       columns=[time_col, price_col, size_col]))
+        else:
+            frames = pd.read_csv(source, usecols=[time_col, price_col, size_col], chunksize=chunksize)
+    else:
+        frames = source
+
+    for frame in frames:
+        if len(frame)==0:
+            continue
+        yield (pd.to_datetime(frame[time_col]).to_numpy(dtype="datetime64[ns]"),
+               frame[price_col].to_numpy(dtype=np.float64),
+               frame[size_col].to_numpy(dtype=np.float64))
+
+##########################################################################################################################################################################################################################
+
+#Streaming Resampler
+
+def _aggregate(keys, times, price, size):
+
+    """Collapses runs of equal keys in time-ordered ticks into bars; returns the bar keys, the time of the first tick of every
+    bar and the Open, High, Low, Close and Volume arrays"""
+
+    starts = np.flatnonzero(np.concatenate([[True], keys[1:]!=keys[:-1]]))
+    ends = np.concatenate([starts[1:], [len(keys)]])
+    return (keys[starts], times[starts], price[starts], np.maximum.reduceat(price, starts),
+            np.minimum.reduceat(price, starts), price[ends-1], np.add.reduceat(size, starts))
+
+
+def _bars_frame(index, open_price, high, low, close, volume):
+
+    """Returns bars in the column layout of AAPL_data.csv"""
+
+    return pd.DataFrame({"High": high, "Low": low, "Open": open_price, "Close": close, "Volume": volume, "Adj Close": close},
+                        index=pd.DatetimeIndex(index), columns=BAR_COLUMNS)
+
+
+def resample_ticks(source, bar_size="1min", by="time", chunksize=1000000, time_col="Timestamp", price_col="Price",
+                   size_col="Size"):
+
+    """Intakes a time-ordered tick source (CSV or Parquet path, or an iterable of dataframes) with timestamp, price and size
+    columns and yields OHLCV bars chunk by chunk, with the columns High, Low, Open, Close, Volume and Adj Close that
+    strategy_engine and Technical_Indicators expect. Memory stays bounded by chunksize ticks.
+    by="time" builds bars of the pandas frequency bar_size (e.g. "1min", "5min") indexed by the bar start; periods without
+    ticks produce no bar. by="volume" closes a bar as soon as it holds bar_size shares (a tick is never split between bars)
+    and indexes it by the time of its first tick."""
+
+    if by not in ("time", "volume"):
+        raise ValueError("by should be either time or volume")
+    if by=="time":
+        bar_nanoseconds = pd.Timedelta(bar_size).value
+    elif bar_size<=0:
+        raise ValueError("bar_size should be a positive volume when by is volume")
+
+    carry = None
+    last_time = None
+    bar_number = 0
+    bar_volume = 0.0
+    for times, price, size in _tick_chunks(source, chunksize, time_col, price_col, size_col):
+        if np.any(times[1:]<times[:-1]) or ((last_time is not None) and (times[0]<last_time)):
+            raise ValueError("ticks must be ordered by time")
+        last_time = times[-1]
+
+        if by=="time":
+            keys = times.view(np.int64)//bar_nanoseconds*bar_nanoseconds
+        else:
+            #A bar closes with the tick that brings it to bar_size shares and the next bar starts empty, so the bars are cut
+            #one after another: each ends at the first tick whose running volume reaches the volume at its start plus bar_size
+            volume_after = np.cumsum(size)
+            ends = []
+            end = np.searchsorted(volume_after, bar_size-bar_volume)
+            while end<len(volume_after):
+                ends.append(end)
+                end = np.searchsorted(volume_after, volume_after[end]+bar_size)
+            new_bar = np.zeros(len(size), dtype=np.int64)
+            new_bar[[end+1 for end in ends if end+1<len(size)]] = 1
+            keys = bar_number + np.cumsum(new_bar)
+            if ends:
+                bar_volume = volume_after[-1]-volume_after[ends[-1]]
+                bar_number = keys[-1]+int(ends[-1]==len(size)-1)
+            else:
+                bar_volume = bar_volume+volume_after[-1]
+        bars = list(_aggregate(keys, times, price, size))
+
+        #The first bar of the chunk continues the last, possibly unfinished, bar of the previous chunk
+        if carry is not None:
+            if bars[0][0]==carry[0]:
+                bars[1][0] = carry[1]
+                bars[2][0] = carry[2]
+                bars[3][0] = max(bars[3][0], carry[3])
+                bars[4][0] = min(bars[4][0], carry[4])
+                bars[6][0] = bars[6][0]+carry[6]
+            else:
+                bars = [np.concatenate([[carry[j]], bars[j]]) for j in range(7)]
+
+        carry = tuple(column[-1] for column in bars)
+        if len(bars[0])>1:
+            index = bars[0][:-1].astype("datetime64[ns]") if by=="time" else bars[1][:-1]
+            yield _bars_frame(index, bars[2][:-1], bars[3][:-1], bars[4][:-1], bars[5][:-1], bars[6][:-1])
+
+    if carry is not None:
+        index = [np.datetime64(int(carry[0]), "ns")] if by=="time" else [carry[1]]
+        yield _bars_frame(index, [carry[2]], [carry[3]], [carry[4]], [carry[5]], [carry[6]])
+
+
+def load_bars(source, bar_size="1min", by="time", chunksize=1000000, time_col="Timestamp", price_col="Price",
+              size_col="Size"):
+
+    """Runs resample_ticks over the whole source and returns all bars in one price dataframe"""
+
+    frames = list(resample_ticks(source, bar_size, by, chunksize, time_col, price_col, size_col))
+    if not frames:
+        return _bars_frame(np.array([], dtype="datetime64[ns]"), [], [], [], [], [])
+    return pd.concat(frames)
@@ -0,0 +1,240 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import warnings
+import numpy as np
+import pandas as pd
+
+##########################################################################################################################################################################################################################
+
+#Benchmark Data
+
+def synthetic_prices(n_bars, seed=0):
+
+    """Intakes the number of bars and returns a reproducible random-walk OHLCV dataframe with one-minute timestamps and the
+    same column layout as AAPL_data.csv"""
+
+    rng = np.random.default_rng(seed)
+    close = 100*np.exp(np.cumsum(rng.normal(0, 0.001, n_bars)))
+    open_price = np.concatenate([[100], close[:-1]])
+    high = np.maximum(open_price, close)*(1+np.abs(rng.normal(0, 0.0005, n_bars)))
+    low = np.minimum(open_price, close)*(1-np.abs(rng.normal(0, 0.0005, n_bars)))
+    volume = rng.integers(1000, 100000, n_bars).astype(np.float64)
+
+    return pd.DataFrame({"High": high, "Low": low, "Open": open_price, "Close": close, "Volume": volume, "Adj Close": close},
+                        index=pd.date_range("2000-01-01", periods=n_bars, freq="min"))
+
+
+def benchmark_datasets(sizes):
+
+    """Returns the benchmark datasets: AAPL_data.csv plus one synthetic series per size"""
+
+    from Price_Store import load_prices
+
+    datasets = {"AAPL": load_prices(os.path.join(os.path.dirname(os.path.abspath(__file__)), "AAPL_data.csv"))}
+    for n_bars in sizes:
+        datasets["synthetic {}".format(n_bars)] = synthetic_prices(n_bars)
+    return datasets
+
+##########################################################################################################################################################################################################################
+
+#Benchmark Cases
+
+def benchmark_cases():
+
+    """Returns a list of (name, max_bars, function) cases, where function intakes a price dataframe and runs the timed code;
+    max_bars skips cases that would take too long on the larger series"""
+
+    import Technical_Indicators as ti
+    from Bollinger_Bands import boll_buy_lower_sell_upper
+    from Golden_Cross_Death_Cross import golden_cross_death_cross
+    from Strategy_Engine import strategy_engine
+    from Hackathon_Engine import Hackathon_Simulation
+
+    def engine(fast):
+        def run(price_df):
+            strategy = boll_buy_lower_sell_upper(price_df.copy(), encoded=True)
+            strategy_engine(price_df, strategy, 100000, 0.01, 0.1, close_positions=True, fast=fast)
+        return run
+
+    def hackathon(price_df):
+        strat_list = [boll_buy_lower_sell_upper(price_df.copy()), golden_cross_death_cross(price_df.copy())]
+        Hackathon_Simulation(price_df, strat_list, ["Bollinger Bands", "Golden Cross - Death Cross"], 100000, [0.01, 0.1],
+                             [0.1, 1])
+
+    return [("SMA", None, lambda price_df: ti.SMA(price_df.copy())),
+            ("EMA", None, lambda price_df: ti.EMA(price_df.copy())),
+            ("MACD", None, lambda price_df: ti.MACD(price_df.copy())),
+            ("Bollinger_Bands", None, lambda price_df: ti.Bollinger_Bands(price_df.copy())),
+            ("RSI", None, lambda price_df: ti.RSI(price_df.copy())),
+            ("ADX", None, lambda price_df: ti.ADX(price_df.copy())),
+            ("boll_buy_lower_sell_upper", None, lambda price_df: boll_buy_lower_sell_upper(price_df.copy())),
+            ("golden_cross_death_cross", None, lambda price_df: golden_cross_death_cross(price_df.copy())),
+            ("strategy_engine", 5000, engine(False)),
+            ("strategy_engine fast", None, engine(True)),
+            ("Hackathon_Simulation", None, hackathon)]
+
+
+def time_case(function, price_df, repeats):
+
+    """Returns the best wall time in seconds of repeats cold runs; the indicator cache is cleared before every run"""
+
+    from Indicator_Cache import default_cache
+
+    timings = []
+    for _ in range(repeats):
+        default_cache.clear()
+        with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            start = time.perf_counter()
+            function(price_df)
+            timings.append(time.perf_counter()-start)
+    return min(timings)
+
+
+def run_benchmarks(sizes=(10000, 100000, 1000000), repeats=3, cases=None):
+
+    """Runs every benchmark case on every dataset and returns {"dataset | case": seconds}; the larger series are timed once"""
+
+    from Technical_Indicators import _load_lfilter
+
+    #scipy is imported lazily by the first recursive filter, so it is loaded here rather than inside the first timed case
+    _load_lfilter()
+    results = {}
+    for dataset_name, price_df in benchmark_datasets(sizes).items():
+        for case_name, max_bars, function in benchmark_cases():
+            if (cases is not None) and (case_name not in cases):
+                continue
+            if (max_bars is not None) and (len(price_df)>max_bars):
+                continue
+            results["{} | {}".format(dataset_name, case_name)] = time_case(function, price_df,
+                                                                           repeats if len(price_df)<=100000 else 1)
+            print("{:<60}{:>12.6f} s".format(dataset_name+" | "+case_name, results[dataset_name+" | "+case_name]))
+    return results
+
+##########################################################################################################################################################################################################################
+
+#Cold Start
+
+HEADLESS_MODULES = ["Technical_Indicators", "Bollinger_Bands", "Golden_Cross_Death_Cross", "Strategy_Engine",
+                    "Hackathon_Engine", "Streaming_Indicators", "Performance_Metrics"]
+#Modules that only plotting or optional fast paths need, which a headless import must not load
+DEFERRED_MODULES = ["plotly", "scipy", "numba"]
+#Allowed cold import time of a headless module in seconds
+IMPORT_BUDGET = 1.0
+
+
+def cold_start(module, repeats=3):
+
+    """Imports module in fresh interpreters and returns the best import time in seconds together with the list of
+    DEFERRED_MODULES that the import loaded"""
+
+    code = ("import sys, time; start = time.perf_counter(); import {}; elapsed = time.perf_counter()-start; "
+            "print(elapsed); print(','.join(name for name in {!r} if name in sys.modules))").format(module, DEFERRED_MODULES)
+    timings = []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                capture_output=True, text=True, check=True).stdout.splitlines()
+        timings.append(float(output[0]))
+    return min(timings), [name for name in output[1].split(",") if name]
+
+
+def run_cold_start(modules=HEADLESS_MODULES, repeats=3, budget=IMPORT_BUDGET):
+
+    """Measures the cold import of every headless module; returns {"import | module": seconds} and the list of modules that
+    exceeded the budget in seconds or loaded a deferred module"""
+
+    results = {}
+    failures = []
+    for module in modules:
+        seconds, loaded = cold_start(module, repeats)
+        results["import | "+module] = seconds
+        flag = ""
+        if seconds>budget:
+            failures.append(module)
+            flag = "  OVER BUDGET"
+        if loaded:
+            failures.append(module)
+            flag = flag+"  LOADED "+", ".join(loaded)
+        print("{:<60}{:>12.6f} s{}".format("import | "+module, seconds, flag))
+    return results, failures
+
+##########################################################################################################################################################################################################################
+
+#Stored Results and Regression Check
+
+def save_results(results, path):
+
+    """Writes benchmark results to a JSON file together with the machine and library versions they were measured on"""
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as file:
+        json.dump({"python": platform.python_version(), "machine": platform.machine(), "numpy": np.__version__,
+                   "pandas": pd.__version__, "created": time.strftime("%Y-%m-%d %H:%M:%S"), "results": results},
+                  file, indent=2)
+
+
+def compare_results(results, baseline_path, threshold=0.25, min_delta=0.005):
+
+    """Intakes fresh results and the path of stored baseline results; prints the ratio of every shared case and returns the
+    list of cases that became slower than baseline*(1+threshold) by at least min_delta seconds, so timer noise on
+    sub-millisecond cases does not count as a regression"""
+
+    with open(baseline_path) as file:
+        baseline = json.load(file)["results"]
+
+    regressions = []
+    print("\n{:<60}{:>12}{:>12}{:>9}".format("Case", "Baseline", "Current", "Ratio"))
+    for case in sorted(set(results) & set(baseline)):
+        ratio = results[case]/baseline[case] if baseline[case]>0 else np.inf
+        flag = ""
+        if (ratio>1+threshold) and (results[case]-baseline[case]>=min_delta):
+            regressions.append(case)
+            flag = "  SLOWER"
+        print("{:<60}{:>12.6f}{:>12.6f}{:>9.2f}{}".format(case, baseline[case], results[case], ratio, flag))
+    return regressions
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description="Times the indicators, signal generators, strategy_engine and "
+                                                 "Hackathon_Simulation on AAPL_data.csv and synthetic series")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[10000, 100000, 1000000], help="synthetic series lengths")
+    parser.add_argument("--repeats", type=int, default=3, help="runs per case, the best one is kept")
+    parser.add_argument("--cases", nargs="*", default=None, help="only run these cases")
+    parser.add_argument("--save", default=None, help="write the results to this JSON file")
+    parser.add_argument("--compare", default=None, help="JSON file with baseline results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown before failing")
+    parser.add_argument("--min-delta", type=float, default=0.005, help="ignore slowdowns smaller than this many seconds")
+    parser.add_argument("--cold-start", action="store_true", help="also time the cold import of the headless modules")
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET, help="allowed cold import time in seconds")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.repeats, args.cases)
+    import_failures = []
+    if args.cold_start:
+        import_results, import_failures = run_cold_start(repeats=args.repeats, budget=args.import_budget)
+        results.update(import_results)
+    if args.save is not None:
+        save_results(results, args.save)
+    if args.compare is not None:
+        regressions = compare_results(results, args.compare, args.threshold, args.min_delta)
+        if regressions:
+            print("\n{} case(s) slower than the baseline by more than {:.0%}:".format(len(regressions), args.threshold))
+            for case in regressions:
+                print("  "+case)
+            sys.exit(1)
+    if import_failures:
+        print("\n{} module(s) over the {:.2f} s import budget or loading plotting/scipy at import:".format(
+            len(set(import_failures)), args.import_budget))
+        for module in sorted(set(import_failures)):
+            print("  "+module)
+        sys.exit(1)
@@ -1,48 +1,76 @@
 import numpy as np
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+from Strategy_Engine import decode_signals
+from Technical_Indicators import rolling_mean_std
+from Chart_Rendering import range_slice, downsample_ohlc, downsample_line, render
+from Profiling import profiled
 
-def plot_bollinger_bands(df, sma, n_deviations):
+def plot_bollinger_bands(df, sma, n_deviations, start=None, end=None, max_points=None, image_path=None):
 
-    df["SMA"] = df["Close"].rolling(window=sma).mean()
-    df["Upper Band"] = df["SMA"] + (df["Close"].rolling(window=sma).std()*n_deviations)
-    df["Lower Band"] = df["SMA"] - (df["Close"].rolling(window=sma).std()*n_deviations)
+    """Intakes a price dataframe, SMA period and number of deviations and plots the candlesticks with the Bollinger Bands.
+    Without start and end the whole series is plotted and the SMA, Upper Band and Lower Band columns are added to df as
+    before; with start and/or end the bands are computed only for that date range (plus the SMA warm-up) and df is left
+    unchanged. max_points downsamples the candles (by min/max bucketing) and the band lines (by LTTB) to at most that many
+    points, and image_path writes a static image instead of opening the browser."""
 
-    fig = go.Figure(data=go.Candlestick(x = df.index, open = df["Open"], high = df["High"], low = df["Low"], close = df["Close"], name="Candlestick"))
-    fig.add_trace(go.Scatter(x = df.index, y = df["SMA"], line_color = "blue", name = "SMA"))
-    fig.add_trace(go.Scatter(x = df.index, y = df["Upper Band"], line_color = "red", line = {"dash": "dash"}, name = "Upper Band", opacity = 0.5))
-    fig.add_trace(go.Scatter(x = df.index, y = df["Lower Band"], line_color = "green", line = {"dash": "dash"}, name = "Lower Band", opacity = 0.5))
+    import plotly.graph_objects as go
+
+    window, offset = range_slice(df.index, start, end, lookback=sma-1)
+    plotted_df = df.iloc[window]
+    sma_values, rolling_std = rolling_mean_std(plotted_df["Close"], sma)
+    bands = pd.DataFrame({"SMA": sma_values, "Upper Band": sma_values + rolling_std*n_deviations,
+                          "Lower Band": sma_values - rolling_std*n_deviations}, index=plotted_df.index).iloc[offset:]
+    if (start is None) and (end is None):
+        df["SMA"] = bands["SMA"].to_numpy()
+        df["Upper Band"] = bands["Upper Band"].to_numpy()
+        df["Lower Band"] = bands["Lower Band"].to_numpy()
+
+    candles = downsample_ohlc(plotted_df.iloc[offset:], max_points)
+    sma_line = downsample_line(bands["SMA"], max_points)
+    upper_band = downsample_line(bands["Upper Band"], max_points)
+    lower_band = downsample_line(bands["Lower Band"], max_points)
+
+    fig = go.Figure(data=go.Candlestick(x = candles.index, open = candles["Open"], high = candles["High"], low = candles["Low"], close = candles["Close"], name="Candlestick"))
+    fig.add_trace(go.Scatter(x = sma_line.index, y = sma_line, line_color = "blue", name = "SMA"))
+    fig.add_trace(go.Scatter(x = upper_band.index, y = upper_band, line_color = "red", line = {"dash": "dash"}, name = "Upper Band", opacity = 0.5))
+    fig.add_trace(go.Scatter(x = lower_band.index, y = lower_band, line_color = "green", line = {"dash": "dash"}, name = "Lower Band", opacity = 0.5))
     fig.update_layout(xaxis_rangeslider_visible=False)
-    return fig.show()
+    return render(fig, image_path)
 
 
-def boll_buy_lower_sell_upper(df, sma_number=50, n_deviations=2):
+@profiled("signals/boll_buy_lower_sell_upper")
+def boll_buy_lower_sell_upper(df, sma_number=50, n_deviations=2, encoded=False):
     
-    trading_signals = np.array([])
-    df["SMA"] = df["Close"].rolling(window=sma_number).mean()
-    df["Upper Band"] = df["SMA"] + (df["Close"].rolling(window=sma_number).std()*n_deviations)
-    df["Lower Band"] = df["SMA"] - (df["Close"].rolling(window=sma_number).std()*n_deviations)
+    """Intakes a price dataframe, SMA period and number of deviations for the bands; returns the array of Buy, Sell or None
+    signals: Buy when Close touches the Lower Band and Sell when Close touches the Upper Band.
+    With encoded=True returns the int8 array of +1 (Buy), -1 (Sell) and 0 (None) that strategy_engine accepts directly."""
     
-    for i in range(0, len(df)):
-        if df["Close"].iloc[i]<=df["Lower Band"].iloc[i]:
-            trading_signals = np.append(trading_signals, "Buy")
-        elif df["Close"].iloc[i]>=df["Upper Band"].iloc[i]:
-            trading_signals = np.append(trading_signals, "Sell")
-        else:
-            trading_signals = np.append(trading_signals, None)
+    sma, rolling_std = rolling_mean_std(df["Close"], sma_number)
+    upper_band = sma + rolling_std*n_deviations
+    lower_band = sma - rolling_std*n_deviations
+    df["SMA"] = sma.copy()
+    df["Upper Band"] = upper_band
+    df["Lower Band"] = lower_band
     
-    return trading_signals
-
+    close = df["Close"].to_numpy(dtype=np.float64)
+    buy = close<=lower_band
+    sell = ~buy & (close>=upper_band)
+    
+    trading_signals = buy.astype(np.int8) - sell.astype(np.int8)
+    if encoded:
+        return trading_signals
+    return decode_signals(trading_signals)
 
 if __name__ == '__main__':
 
+    import plotly.express as px
+    from Price_Store import load_prices
     from Strategy_Engine import strategy_engine
 
     #For VSCode
-    #price_df = pd.read_csv(r"Trading_Strategies\Algotrading\AAPL_data.csv", index_col="Date")
+    #price_df = load_prices(r"Trading_Strategies\Algotrading\AAPL_data.csv")
     #For Jupyter Notebook
-    price_df = pd.read_csv("AAPL_data.csv", index_col="Date")
+    price_df = load_prices("AAPL_data.csv")
     price_df.index.name = None
 
     #plot_bollinger_bands(price_df, 50, 2)
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+
+##########################################################################################################################################################################################################################
+
+#Plotted Date Range
+
+def range_slice(index, start=None, end=None, lookback=0):
+
+    """Intakes a sorted DatetimeIndex, the first and last dates to plot (None for the ends of the series) and the number of
+    earlier bars an indicator needs to warm up; returns (window, offset) where window is the slice of rows to compute the
+    indicators on and offset is the position of the first plotted row inside that window"""
+
+    first = 0 if start is None else index.searchsorted(pd.Timestamp(start), side="left")
+    last = len(index) if end is None else index.searchsorted(pd.Timestamp(end), side="right")
+    if first>=last:
+        raise ValueError("there are no bars between start and end")
+    window_start = max(first-lookback, 0)
+
+    return slice(window_start, last), first-window_start
+
+##########################################################################################################################################################################################################################
+
+#Downsampling
+
+def _buckets(n_rows, max_points):
+
+    """Returns the start positions of at most max_points equal buckets over n_rows rows"""
+
+    return np.unique(np.linspace(0, n_rows, max_points+1)[:-1].astype(np.int64))
+
+
+def downsample_ohlc(df, max_points):
+
+    """Intakes a price dataframe with Open, High, Low and Close and returns at most max_points candles: every bucket of
+    consecutive bars becomes one candle with the first Open, the highest High, the lowest Low and the last Close, so no
+    price extreme disappears from the chart. Candles are indexed by the date of their first bar."""
+
+    if (max_points is None) or (len(df)<=max_points):
+        return df[["Open", "High", "Low", "Close"]]
+
+    starts = _buckets(len(df), max_points)
+    ends = np.concatenate([starts[1:], [len(df)]])
+    return pd.DataFrame({"Open": df["Open"].to_numpy(dtype=np.float64)[starts],
+                         "High": np.fmax.reduceat(df["High"].to_numpy(dtype=np.float64), starts),
+                         "Low": np.fmin.reduceat(df["Low"].to_numpy(dtype=np.float64), starts),
+                         "Close": df["Close"].to_numpy(dtype=np.float64)[ends-1]},
+                        index=df.index[starts])
+
+
+def lttb_indices(y, max_points, x=None):
+
+    """Intakes line values, the number of points to keep and optionally their x positions (bar positions by default);
+    returns the sorted positions of the points kept by Largest-Triangle-Three-Buckets, which preserves the visual shape of
+    the line. NaN points (e.g. the warm-up of an indicator) are never kept."""
+
+    y = np.asarray(y, dtype=np.float64)
+    x = np.arange(len(y), dtype=np.float64) if x is None else np.asarray(x, dtype=np.float64)
+    valid = np.flatnonzero(~np.isnan(y))
+    if (max_points is None) or (len(valid)<=max(max_points, 2)):
+        return valid
+    max_points = max(max_points, 3)
+
+    x = x[valid]
+    y = y[valid]
+    #The first and last points are always kept, the points between them are split into max_points-2 buckets
+    edges = np.linspace(1, len(y)-1, max_points-1).astype(np.int64)
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = len(y)-1
+    for j in range(max_points-2):
+        low, high = edges[j], edges[j+1]
+        if j<max_points-3:
+            next_x = x[edges[j+1]:edges[j+2]].mean()
+            next_y = y[edges[j+1]:edges[j+2]].mean()
+        else:
+            next_x = x[-1]
+            next_y = y[-1]
+        previous = selected[j]
+        #Twice the area of the triangle formed with the previous kept point and the mean of the next bucket
+        area = np.abs((x[previous]-next_x)*(y[low:high]-y[previous]) - (x[previous]-x[low:high])*(next_y-y[previous]))
+        selected[j+1] = low+np.argmax(area)
+
+    return valid[selected]
+
+
+def downsample_line(series, max_points):
+
+    """Intakes an indicator series and returns its LTTB downsampled copy with at most max_points points"""
+
+    kept = lttb_indices(series.to_numpy(dtype=np.float64), max_points,
+                        series.index.asi8 if isinstance(series.index, pd.DatetimeIndex) else None)
+    return series.iloc[kept]
+
+##########################################################################################################################################################################################################################
+
+#Figure Output
+
+def render(fig, image_path=None, scale=1):
+
+    """Shows the figure in the browser, or with image_path writes it to a static image instead (the format follows the
+    extension, e.g. .png, .svg or .pdf; needs the kaleido package) without opening a browser"""
+
+    if image_path is None:
+        return fig.show()
+    fig.write_image(image_path, scale=scale)
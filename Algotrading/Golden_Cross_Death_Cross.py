@@ -1,55 +1,80 @@
 from os import close
 import numpy as np
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+from Strategy_Engine import decode_signals
+from Technical_Indicators import rolling_moments
+from Chart_Rendering import range_slice, downsample_ohlc, downsample_line, render
+from Profiling import profiled
 
-def plot_golden_cross_death_cross(df):
+def plot_golden_cross_death_cross(df, start=None, end=None, max_points=None, image_path=None):
+    
+    """Intakes a price dataframe and plots the candlesticks with the 50 and 200 SMA. Without start and end the whole series
+    is plotted and the 200 SMA and 50 SMA columns are added to df as before; with start and/or end the SMAs are computed only
+    for that date range (plus the 200 bar warm-up) and df is left unchanged. max_points downsamples the candles (by min/max
+    bucketing) and the SMA lines (by LTTB) to at most that many points, and image_path writes a static image instead of
+    opening the browser."""
+    
+    import plotly.graph_objects as go
     
     large_sma = 200
     small_sma = 50
     
-    df["200 SMA"] = df["Close"].rolling(window=large_sma).mean()
-    df["50 SMA"] = df["Close"].rolling(window=small_sma).mean()
+    window, offset = range_slice(df.index, start, end, lookback=large_sma-1)
+    plotted_df = df.iloc[window]
+    large, small = rolling_moments(plotted_df["Close"], (large_sma, small_sma))
+    smas = pd.DataFrame({"200 SMA": large, "50 SMA": small}, index=plotted_df.index).iloc[offset:]
+    if (start is None) and (end is None):
+        df["200 SMA"] = smas["200 SMA"].to_numpy()
+        df["50 SMA"] = smas["50 SMA"].to_numpy()
     
-    fig = go.Figure(data=go.Candlestick(x = df.index, open = df["Open"], high = df["High"], low = df["Low"],
-                                        close = df["Close"], name="Candlestick"))
-    fig.add_trace(go.Scatter(x = df.index, y = df["200 SMA"], line_color = "blue", name = "200 SMA"))
-    fig.add_trace(go.Scatter(x = df.index, y = df["50 SMA"], line_color = "orange", name = "50 SMA"))
+    candles = downsample_ohlc(plotted_df.iloc[offset:], max_points)
+    large_line = downsample_line(smas["200 SMA"], max_points)
+    small_line = downsample_line(smas["50 SMA"], max_points)
+    
+    fig = go.Figure(data=go.Candlestick(x = candles.index, open = candles["Open"], high = candles["High"], low = candles["Low"],
+                                        close = candles["Close"], name="Candlestick"))
+    fig.add_trace(go.Scatter(x = large_line.index, y = large_line, line_color = "blue", name = "200 SMA"))
+    fig.add_trace(go.Scatter(x = small_line.index, y = small_line, line_color = "orange", name = "50 SMA"))
     fig.update_layout(xaxis_rangeslider_visible=False)
-    return fig.show()
+    return render(fig, image_path)
 
 
-def golden_cross_death_cross(df):
+@profiled("signals/golden_cross_death_cross")
+def golden_cross_death_cross(df, encoded=False):
+    
+    """Intakes a price dataframe and returns the array of Buy, Sell or None signals: Buy on the Golden Cross (50 SMA crosses
+    above 200 SMA) and Sell on the Death Cross (50 SMA crosses below 200 SMA).
+    With encoded=True returns the int8 array of +1 (Buy), -1 (Sell) and 0 (None) that strategy_engine accepts directly."""
     
     large_sma = 200
     small_sma = 50
-    trading_signals = np.array([None])
-    
-    df["200 SMA"] = df["Close"].rolling(window=large_sma).mean()
-    df["50 SMA"] = df["Close"].rolling(window=small_sma).mean()
-    
-    for i in range(1, len(df)):
-        #Golden Cross
-        if (df["200 SMA"].iloc[i-1]>df["50 SMA"].iloc[i-1]) and (df["200 SMA"].iloc[i]<df["50 SMA"].iloc[i]):
-            trading_signals = np.append(trading_signals, "Buy")
-        #Death Cross
-        elif (df["200 SMA"].iloc[i-1]<df["50 SMA"].iloc[i-1]) and (df["200 SMA"].iloc[i]>df["50 SMA"].iloc[i]):
-            trading_signals = np.append(trading_signals, "Sell")
-        else:
-            trading_signals = np.append(trading_signals, None)
-    
-    return trading_signals
-
+    
+    #Both SMAs come out of one cached rolling_moments call
+    large, small = rolling_moments(df["Close"], (large_sma, small_sma))
+    df["200 SMA"] = large.copy()
+    df["50 SMA"] = small.copy()
+    
+    trading_signals = np.zeros(len(df), dtype=np.int8)
+    #Golden Cross
+    golden = (large[:-1]>small[:-1]) & (large[1:]<small[1:])
+    #Death Cross
+    death = (large[:-1]<small[:-1]) & (large[1:]>small[1:])
+    trading_signals[1:] = golden.astype(np.int8) - death.astype(np.int8)
+    
+    if encoded:
+        return trading_signals
+    return decode_signals(trading_signals)
 
 if __name__ == '__main__':
 
+    import plotly.express as px
+    from Price_Store import load_prices
     from Strategy_Engine import strategy_engine
 
     #For VSCode
-    #price_df = pd.read_csv(r"Trading_Strategies\Algotrading\AAPL_data.csv", index_col="Date")
+    #price_df = load_prices(r"Trading_Strategies\Algotrading\AAPL_data.csv")
     #For Jupyter Notebook
-    price_df = pd.read_csv("AAPL_data.csv", index_col="Date")
+    price_df = load_prices("AAPL_data.csv")
     price_df.index.name = None
 
     #plot_golden_cross_death_cross(price_df)
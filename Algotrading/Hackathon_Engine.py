@@ -1,8 +1,33 @@
+import contextlib
+import io
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 import numpy as np
 import pandas as pd
-import plotly.express as px
+from Performance_Metrics import ENGINE_METRIC_COLUMNS, engine_metrics
+from Profiling import profiled, stage
 
-def Hackathon_Simulation(price_df, strat_list, strat_names, total_account, risk_per_trade, total_accepted_risk):
+
+def _metrics_frame(rows, index=None):
+    
+    """Returns rows of engine_metrics (a 2-D array or a list of mappings) as a dataframe with integer Number of Trades"""
+    
+    metrics_df = pd.DataFrame(rows, index=index, columns=ENGINE_METRIC_COLUMNS)
+    metrics_df["Number of Trades"] = metrics_df["Number of Trades"].astype(np.int64)
+    return metrics_df
+
+
+@profiled("hackathon/Hackathon_Simulation")
+def Hackathon_Simulation(price_df, strat_list, strat_names, total_account, risk_per_trade, total_accepted_risk,
+                         equity_curve=False, periods_per_year=252, risk_free_rate=0.0):
+    
+    """Intakes a price dataframe; the list of strategy arrays with their names; total account value; and the lists of risk
+    per trade and total accepted risk of every strategy. Every strategy is backtested with all positions closed at the end.
+    Returns the dataframe of cumulative Profit/Loss of every strategy, indexed like price_df.
+    With equity_curve=True returns instead the (time x strategy) float64 matrix of account equity and a summary dataframe
+    with the Performance_Metrics.engine_metrics of every strategy (Max Drawdown as a fraction of the running equity peak,
+    Sharpe and Sortino Ratio annualized with periods_per_year); no trade history dataframe is built in either case."""
     
     from Strategy_Engine import strategy_engine
     
@@ -11,26 +36,256 @@ def Hackathon_Simulation(price_df, strat_list, strat_names, total_account, risk_
     if len(strat_list)!=len(strat_names):
         raise ValueError("The length of strat_list does not coincide with the length of strat_names")
     
-    strat_df = pd.DataFrame(index=price_df.index, columns=strat_names)
+    n_bars = len(price_df)
+    daily_pl = np.zeros((n_bars, len(strat_list)))
+    metrics = np.zeros((len(ENGINE_METRIC_COLUMNS), len(strat_list)))
     
     for i in range(0, len(strat_list)):
-        strat_history = strategy_engine(price_df, strat_list[i], total_account, risk_per_trade[i], total_accepted_risk[i],
-                                        close_positions=True)
-        strat_history_pl = strat_history[["Closed on", "Profit/Loss"]].groupby("Closed on").sum()
-        for j in range(0, len(strat_history_pl)):
-            strat_df.loc[strat_history_pl.index[j], strat_names[i]] = strat_history_pl["Profit/Loss"].iloc[j]
+        #Backtests are always run, so the engine prints its final balance (or bankruptcy) for every strategy; only the
+        #indicators behind the signals come from the indicator cache
+        with stage("hackathon/strategy/{}".format(strat_names[i])):
+            trades = strategy_engine(price_df, strat_list[i], total_account, risk_per_trade[i], total_accepted_risk[i],
+                                     close_positions=True, ledger=True)
+            closed = ~trades.is_open()
+            #Scatter-add the P/L of every closed trade onto the bar position it was closed on
+            daily_pl[:, i] = np.bincount(trades.bar_positions[1][closed], weights=trades["Profit/Loss"][closed],
+                                         minlength=n_bars)
+            metrics[:, i] = engine_metrics(trades, price_df, total_account, periods_per_year, risk_free_rate)
         print("Completed: ", strat_names[i])
+    
+    with stage("hackathon/aggregation"):
+        cumulative_pl = np.cumsum(daily_pl, axis=0)
+        if not equity_curve:
+            return pd.DataFrame(cumulative_pl, index=price_df.index, columns=strat_names)
         
-    strat_pl = np.cumsum(strat_df.fillna(0))
+        equity = total_account + cumulative_pl
+        summary = _metrics_frame(metrics.T, pd.Index(strat_names, name="Strategy"))
+    
+    return equity, summary
+
+_ENGINE_PARAMETERS = ("risk_per_trade", "total_accepted_risk")
+_sweep_shm = None
+_sweep_prices = None
+
+
+def _sweep_init(shm_name, shape, columns, index):
+    
+    """Attaches a sweep worker to the shared memory block that holds the price matrix"""
+    
+    global _sweep_shm, _sweep_prices
+    _sweep_shm = shared_memory.SharedMemory(name=shm_name)
+    values = np.ndarray(shape, dtype=np.float64, buffer=_sweep_shm.buf)
+    values.flags.writeable = False
+    _sweep_prices = (values, columns, index)
+
+
+def _sweep_run(strategy_factory, params, total_account, risk_per_trade, total_accepted_risk, periods_per_year,
+               risk_free_rate):
+    
+    """Runs one backtest of the sweep on the shared price matrix and returns its summary metrics"""
+    
+    from Strategy_Engine import strategy_engine
+    
+    values, columns, index = _sweep_prices
+    price_df = pd.DataFrame(values, index=index, columns=columns)
+    strategy_params = {name: value for name, value in params.items() if name not in _ENGINE_PARAMETERS}
+    risk_per_trade = params.get("risk_per_trade", risk_per_trade)
+    total_accepted_risk = params.get("total_accepted_risk", total_accepted_risk)
+    
+    strategy = strategy_factory(price_df, **strategy_params)
+    with contextlib.redirect_stdout(io.StringIO()):
+        trades = strategy_engine(price_df, strategy, total_account, risk_per_trade, total_accepted_risk,
+                                 close_positions=True, ledger=True)
+    
+    return engine_metrics(trades, price_df, total_account, periods_per_year, risk_free_rate).to_dict()
+
+
+@profiled("sweep/Hackathon_Sweep")
+def Hackathon_Sweep(price_df, strategy_factory, param_grid, total_account, risk_per_trade=0.01, total_accepted_risk=0.1,
+                    metric="Total Profit/Loss", ascending=False, max_workers=None, periods_per_year=252, risk_free_rate=0.0):
+    
+    """Intakes a price dataframe; a strategy factory called as strategy_factory(price_df, **params) that returns a strategy
+    array (e.g. boll_buy_lower_sell_upper); a parameter grid mapping parameter names to lists of values, where
+    risk_per_trade and total_accepted_risk are passed to the engine instead of the factory; and the account settings.
+    Every combination is backtested in a ProcessPoolExecutor whose workers read the prices from shared memory.
+    Returns one row per combination with its Performance_Metrics.engine_metrics (e.g. Sharpe Ratio, Sortino Ratio, or Max
+    Drawdown as a fraction of the running equity peak), sorted by metric, which may also be a parameter; ties keep the grid
+    order, so the table is reproducible."""
+    
+    if len(param_grid)<1:
+        raise ValueError("param_grid must include at least one parameter")
+    
+    names = list(param_grid)
+    combinations = [dict(zip(names, values)) for values in itertools.product(*(param_grid[name] for name in names))]
+    
+    values = price_df.to_numpy(dtype=np.float64)
+    shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    try:
+        np.ndarray(values.shape, dtype=np.float64, buffer=shm.buf)[:] = values
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_sweep_init,
+                                 initargs=(shm.name, values.shape, list(price_df.columns), price_df.index)) as executor:
+            results = list(executor.map(_sweep_run, itertools.repeat(strategy_factory), combinations,
+                                        itertools.repeat(total_account), itertools.repeat(risk_per_trade),
+                                        itertools.repeat(total_accepted_risk), itertools.repeat(periods_per_year),
+                                        itertools.repeat(risk_free_rate)))
+    finally:
+        shm.close()
+        shm.unlink()
+    
+    sweep_df = pd.concat([pd.DataFrame(combinations, columns=names), _metrics_frame(results)], axis=1)
+    if metric not in sweep_df.columns:
+        raise ValueError("metric must be one of the sweep columns: {}".format(", ".join(sweep_df.columns)))
+    
+    return sweep_df.sort_values(metric, ascending=ascending, kind="mergesort").reset_index(drop=True)
+
+##########################################################################################################################################################################################################################
+
+#Walk-Forward Evaluation
+
+_walk_forward_shm = None
+_walk_forward_data = None
+
+
+def walk_forward_folds(n_bars, train_size, test_size, step=None, anchored=False):
+    
+    """Intakes the number of bars, the training and test window lengths in bars and the step between folds (test_size by
+    default, so test windows do not overlap); returns the list of (train start, train end, test start, test end) bar
+    positions, ends exclusive, of every fold whose test window fits in the series. With anchored=True every training window
+    starts at the first bar instead of rolling forward."""
+    
+    if (train_size<1) or (test_size<1):
+        raise ValueError("train_size and test_size should be positive numbers of bars")
+    if step is None:
+        step = test_size
+    if step<1:
+        raise ValueError("step should be a positive number of bars")
+    
+    return [(0 if anchored else train_start, train_start+train_size, train_start+train_size, train_start+train_size+test_size)
+            for train_start in range(0, n_bars-train_size-test_size+1, step)]
+
+
+def _walk_forward_init(close_name, n_bars, signals_name, n_strategies):
+    
+    """Attaches a walk-forward worker to the shared memory blocks that hold the Close prices and the encoded signals of every
+    strategy"""
+    
+    global _walk_forward_shm, _walk_forward_data
+    _walk_forward_shm = (shared_memory.SharedMemory(name=close_name), shared_memory.SharedMemory(name=signals_name))
+    close = np.ndarray((n_bars,), dtype=np.float64, buffer=_walk_forward_shm[0].buf)
+    signals = np.ndarray((n_strategies, n_bars), dtype=np.int8, buffer=_walk_forward_shm[1].buf)
+    close.flags.writeable = False
+    signals.flags.writeable = False
+    _walk_forward_data = (close, signals)
+
+
+def _walk_forward_run(start, stop, strategy_index, total_account, risk_per_trade, total_accepted_risk, periods_per_year,
+                      risk_free_rate):
+    
+    """Backtests one strategy on the bars [start, stop) of the shared arrays, with all positions closed at the end of the
+    window, and returns its engine_metrics"""
     
-    return strat_pl
+    from Strategy_Engine import strategy_engine
+    
+    close, signals = _walk_forward_data
+    #Both slices are views into shared memory, nothing is copied per fold
+    price_df = pd.DataFrame({"Close": close[start:stop]}, copy=False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        trades = strategy_engine(price_df, signals[strategy_index, start:stop], total_account, risk_per_trade,
+                                 total_accepted_risk, close_positions=True, ledger=True)
+    
+    return engine_metrics(trades, price_df, total_account, periods_per_year, risk_free_rate).to_dict()
+
+
+@profiled("walk_forward/Hackathon_Walk_Forward")
+def Hackathon_Walk_Forward(price_df, strategy_factory, param_grid, total_account, train_size, test_size, step=None,
+                           anchored=False, risk_per_trade=0.01, total_accepted_risk=0.1, metric="Total Profit/Loss",
+                           ascending=False, max_workers=None, periods_per_year=252, risk_free_rate=0.0):
+    
+    """Intakes a price dataframe; a strategy factory called as strategy_factory(price_df, **params) (e.g.
+    boll_buy_lower_sell_upper); a parameter grid as in Hackathon_Sweep, which may be empty to evaluate the factory with its
+    defaults; the account settings; and the fold layout of walk_forward_folds.
+    The signals of every parameter combination are computed once over the full series and shared with the worker processes,
+    which backtest fold slices of them without copying. In every fold the combination with the best in-sample metric
+    (largest unless ascending) is chosen on the training window and then backtested on the test window; metric is one of
+    the Performance_Metrics.ENGINE_METRIC_COLUMNS, e.g. Sharpe Ratio, or Max Drawdown with ascending=True.
+    Returns one row per fold with its train and test dates, the chosen parameters, the in-sample metric and the
+    out-of-sample engine_metrics."""
+    
+    from Strategy_Engine import encode_signals
+    
+    if metric not in ENGINE_METRIC_COLUMNS:
+        raise ValueError("metric should be one of {}".format(", ".join(ENGINE_METRIC_COLUMNS)))
+    folds = walk_forward_folds(len(price_df), train_size, test_size, step, anchored)
+    if len(folds)<1:
+        raise ValueError("price_df is shorter than one training and test window")
+    
+    names = list(param_grid)
+    combinations = [dict(zip(names, values)) for values in itertools.product(*(param_grid[name] for name in names))]
+    
+    #Indicators and signals are computed once per distinct strategy parameters, not once per fold or engine setting
+    strategy_keys = []
+    signal_rows = []
+    for params in combinations:
+        key = tuple((name, value) for name, value in params.items() if name not in _ENGINE_PARAMETERS)
+        if key not in strategy_keys:
+            strategy_keys.append(key)
+            with stage("walk_forward/signals"):
+                signal_rows.append(encode_signals(strategy_factory(price_df.copy(), **dict(key))))
+    strategy_index = [strategy_keys.index(tuple((name, value) for name, value in params.items()
+                                                if name not in _ENGINE_PARAMETERS)) for params in combinations]
+    engine_params = [(params.get("risk_per_trade", risk_per_trade), params.get("total_accepted_risk", total_accepted_risk))
+                     for params in combinations]
+    
+    close = price_df["Close"].to_numpy(dtype=np.float64)
+    close_shm = shared_memory.SharedMemory(create=True, size=max(close.nbytes, 1))
+    signals_shm = shared_memory.SharedMemory(create=True, size=max(len(signal_rows)*len(close), 1))
+    try:
+        np.ndarray(close.shape, dtype=np.float64, buffer=close_shm.buf)[:] = close
+        np.ndarray((len(signal_rows), len(close)), dtype=np.int8, buffer=signals_shm.buf)[:] = np.vstack(signal_rows)
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_walk_forward_init,
+                                 initargs=(close_shm.name, len(close), signals_shm.name, len(signal_rows))) as executor:
+            #In-sample backtests of every combination on every training window
+            tasks = [(fold[0], fold[1], strategy_index[j], total_account)+engine_params[j]+(periods_per_year, risk_free_rate)
+                     for fold in folds for j in range(len(combinations))]
+            in_sample = list(executor.map(_walk_forward_run, *zip(*tasks)))
+            in_sample = np.array([result[metric] for result in in_sample], dtype=np.float64).reshape(len(folds),
+                                                                                                    len(combinations))
+            #NaN (e.g. the Win Rate of a window without trades) never wins, and ties keep the grid order
+            chosen = np.argmin(np.where(np.isnan(in_sample), np.inf, in_sample), axis=1) if ascending else \
+                     np.argmax(np.where(np.isnan(in_sample), -np.inf, in_sample), axis=1)
+            
+            #Out-of-sample backtests of the chosen combination on every test window
+            out_of_sample = list(executor.map(_walk_forward_run, [fold[2] for fold in folds], [fold[3] for fold in folds],
+                                              [strategy_index[j] for j in chosen], itertools.repeat(total_account),
+                                              [engine_params[j][0] for j in chosen], [engine_params[j][1] for j in chosen],
+                                              itertools.repeat(periods_per_year), itertools.repeat(risk_free_rate)))
+    finally:
+        close_shm.close()
+        close_shm.unlink()
+        signals_shm.close()
+        signals_shm.unlink()
+    
+    index = price_df.index
+    fold_df = pd.DataFrame({"Train Start": [index[fold[0]] for fold in folds],
+                            "Train End": [index[fold[1]-1] for fold in folds],
+                            "Test Start": [index[fold[2]] for fold in folds],
+                            "Test End": [index[fold[3]-1] for fold in folds]},
+                           index=pd.RangeIndex(len(folds), name="Fold"))
+    for name in names:
+        fold_df[name] = [combinations[j][name] for j in chosen]
+    fold_df["In-Sample "+metric] = in_sample[np.arange(len(folds)), chosen]
+    
+    return pd.concat([fold_df, _metrics_frame(out_of_sample, fold_df.index)], axis=1)
+
 
 if __name__ == '__main__':
 
+    import plotly.express as px
+    from Price_Store import load_prices
     #For VSCode
-    price_df = pd.read_csv(r"Trading_Strategies\Algotrading\AAPL_data.csv", index_col="Date")
+    price_df = load_prices(r"Trading_Strategies\Algotrading\AAPL_data.csv")
     #For Jupyter Notebook
-    #price_df = pd.read_csv("AAPL_data.csv", index_col="Date")
+    #price_df = load_prices("AAPL_data.csv")
     price_df.index.name = None
 
     from Bollinger_Bands import boll_buy_lower_sell_upper
@@ -0,0 +1,132 @@
+import hashlib
+import os
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+##########################################################################################################################################################################################################################
+
+#Data Fingerprint
+
+def fingerprint(*data):
+
+    """Intakes price columns, indices or signal arrays and returns a hex digest of their dtypes, shapes and contents"""
+
+    digest = hashlib.blake2b(digest_size=16)
+    for values in data:
+        if isinstance(values, (pd.Series, pd.Index)):
+            values = values.to_numpy()
+        values = np.asarray(values)
+        if values.dtype==object:
+            values = pd.util.hash_array(values.ravel())
+        values = np.ascontiguousarray(values)
+        digest.update("{}{}".format(values.dtype.str, values.shape).encode())
+        digest.update(values.view(np.uint8).ravel())
+    return digest.hexdigest()
+
+##########################################################################################################################################################################################################################
+
+#Indicator Cache
+
+class Indicator_Cache:
+
+    """LRU cache for indicator results keyed by the data fingerprint, the indicator name and its parameters
+    The in-memory tier holds at most max_bytes of arrays; with cache_dir set, every result is also written there as .npz and
+    memory misses are served from disk before recomputing. Cached arrays are read-only, copy them before modifying."""
+
+    def __init__(self, max_bytes=64*2**20, cache_dir=None):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.entries = OrderedDict()
+        self.n_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, name, params, *data):
+
+        """Returns the cache key of an indicator computed with params over data"""
+
+        return "{}-{}".format(fingerprint(*data), hashlib.blake2b(repr((name, sorted(params.items()))).encode(),
+                                                                  digest_size=16).hexdigest())
+
+    def get_or_compute(self, name, params, data, compute):
+
+        """Intakes the indicator name, its parameters, the input arrays (or a single array) and a function without arguments
+        that computes the indicator; returns the cached result, either one array or a tuple of arrays"""
+
+        if not isinstance(data, (tuple, list)):
+            data = (data,)
+        key = self.key(name, params, *data)
+
+        value = self._get(key)
+        if value is not None:
+            self.hits = self.hits+1
+            return value
+
+        self.misses = self.misses+1
+        value = compute()
+        arrays = value if isinstance(value, tuple) else (value,)
+        arrays = tuple(np.asarray(array) for array in arrays)
+        for array in arrays:
+            array.flags.writeable = False
+        value = arrays if isinstance(value, tuple) else arrays[0]
+
+        self._put(key, value)
+        if self.cache_dir is not None:
+            self._save(key, arrays, isinstance(value, tuple))
+        return value
+
+    def clear(self):
+
+        """Empties the in-memory tier; the on-disk tier is left untouched"""
+
+        self.entries.clear()
+        self.n_bytes = 0
+
+    def _get(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        if self.cache_dir is not None:
+            path = os.path.join(self.cache_dir, key+".npz")
+            if os.path.exists(path):
+                with np.load(path) as stored:
+                    arrays = tuple(stored["arr_{}".format(i)] for i in range(len(stored.files)-1))
+                    is_tuple = bool(stored["is_tuple"])
+                for array in arrays:
+                    array.flags.writeable = False
+                value = arrays if is_tuple else arrays[0]
+                self._put(key, value)
+                return value
+        return None
+
+    def _put(self, key, value):
+        size = sum(array.nbytes for array in (value if isinstance(value, tuple) else (value,)))
+        if size>self.max_bytes:
+            return
+        self.entries[key] = value
+        self.n_bytes = self.n_bytes+size
+        while self.n_bytes>self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.n_bytes = self.n_bytes-sum(array.nbytes for array in (evicted if isinstance(evicted, tuple) else (evicted,)))
+
+    def _save(self, key, arrays, is_tuple):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = os.path.join(self.cache_dir, key+".npz")
+        temporary_path = path+".{}.tmp".format(os.getpid())
+        with open(temporary_path, "wb") as file:
+            np.savez(file, *arrays, is_tuple=np.array(is_tuple))
+        os.replace(temporary_path, path)
+
+
+default_cache = Indicator_Cache()
+
+
+def cached_indicator(name, params, data, compute, cache=None):
+
+    """Intakes the indicator name, its parameters, the input arrays and the compute function; returns the result from cache
+    (default_cache unless another Indicator_Cache is given) and computes it only on a miss"""
+
+    if cache is None:
+        cache = default_cache
+    return cache.get_or_compute(name, params, data, compute)
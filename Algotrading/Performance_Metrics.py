@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+from Trade_Ledger import Trade_Ledger
+
+METRIC_COLUMNS = ["Total Return", "Sharpe Ratio", "Sortino Ratio", "Max Drawdown", "Win Rate", "Exposure"]
+ENGINE_METRIC_COLUMNS = ["Final Balance", "Total Profit/Loss", "Number of Trades"]+METRIC_COLUMNS
+
+##########################################################################################################################################################################################################################
+
+#Metrics over Return Matrices
+
+def _metrics_block(returns, exposed, periods_per_year, risk_free_rate):
+
+    """Computes the metric columns for a (time x strategy) block of period returns and the matching exposure mask"""
+
+    excess = returns - risk_free_rate/periods_per_year
+    mean = excess.mean(axis=0)
+    equity = np.cumprod(1+returns, axis=0)
+    #The running peak starts from the initial equity of 1
+    peak = np.maximum(np.maximum.accumulate(equity, axis=0), 1)
+    n_active = np.count_nonzero(returns, axis=0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.column_stack([equity[-1]-1,
+                                mean/excess.std(axis=0, ddof=1)*np.sqrt(periods_per_year),
+                                mean/np.sqrt(np.mean(np.square(np.minimum(excess, 0)), axis=0))*np.sqrt(periods_per_year),
+                                ((peak-equity)/peak).max(axis=0),
+                                np.count_nonzero(returns>0, axis=0)/n_active,
+                                exposed.mean(axis=0)])
+
+
+def returns_metrics(returns, periods_per_year=252, risk_free_rate=0.0, exposure=None, chunk_size=128):
+
+    """Intakes the period returns of one strategy (1-D) or of many strategies at once (a time x strategy array or dataframe),
+    the number of periods per year and the annual risk-free rate; returns Total Return (compounded), the annualized Sharpe
+    Ratio and Sortino Ratio, Max Drawdown (as a fraction of the running peak), Win Rate (the share of periods with a nonzero
+    return that were positive) and Exposure (the share of periods in the market: where exposure, a boolean mask of the same
+    shape, is True, or else where the return is nonzero).
+    All strategies are processed together in vectorized blocks of chunk_size columns; the result is a Series for 1-D input
+    and a dataframe with one row per strategy otherwise. NaN returns count as flat periods."""
+
+    names = returns.columns if isinstance(returns, pd.DataFrame) else None
+    values = np.nan_to_num(np.asarray(returns, dtype=np.float64))
+    one_dimensional = values.ndim==1
+    if one_dimensional:
+        values = values[:, None]
+    if exposure is not None:
+        exposure = np.asarray(exposure, dtype=bool).reshape(values.shape)
+    if len(values)<1:
+        raise ValueError("returns must include at least one period")
+
+    metrics = np.empty((values.shape[1], len(METRIC_COLUMNS)))
+    for start in range(0, values.shape[1], chunk_size):
+        block = values[:, start:start+chunk_size]
+        exposed = (block!=0) if exposure is None else exposure[:, start:start+chunk_size]
+        metrics[start:start+block.shape[1]] = _metrics_block(block, exposed, periods_per_year, risk_free_rate)
+
+    if one_dimensional:
+        return pd.Series(metrics[0], index=METRIC_COLUMNS)
+    return pd.DataFrame(metrics, index=names, columns=METRIC_COLUMNS)
+
+
+def equity_metrics(equity, initial_equity, periods_per_year=252, risk_free_rate=0.0, exposure=None, chunk_size=128):
+
+    """Intakes account equity curves (1-D, or time x strategy like the equity matrix of Hackathon_Simulation) and the
+    starting equity; returns the returns_metrics of their period returns"""
+
+    names = equity.columns if isinstance(equity, pd.DataFrame) else None
+    equity = np.asarray(equity, dtype=np.float64)
+    previous = np.concatenate([np.broadcast_to(np.float64(initial_equity), (1,)+equity.shape[1:]), equity[:-1]])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = equity/previous-1
+    if names is not None:
+        returns = pd.DataFrame(returns, columns=names)
+    return returns_metrics(returns, periods_per_year, risk_free_rate, exposure, chunk_size)
+
+##########################################################################################################################################################################################################################
+
+#Metrics of strategy_engine Output
+
+def _trade_bars(trades, index):
+
+    """Returns the opening bar, closing bar (-1 while open) and Profit/Loss of every trade of a strategy_engine history
+    dataframe or Trade_Ledger. The bar positions a ledger keeps from strategy_engine are used as they are; otherwise the
+    trades are looked up by their timestamps in index, which must then be unique"""
+
+    if isinstance(trades, Trade_Ledger):
+        if trades.bar_positions is not None:
+            opened_bar, closed_bar = trades.bar_positions
+            return opened_bar, closed_bar, trades["Profit/Loss"]
+        closed = ~trades.is_open()
+        opened_on, closed_on, profit_loss = trades["Opened on"], trades["Closed on"][closed], trades["Profit/Loss"]
+    else:
+        closed = trades["Closed on"].notna().to_numpy()
+        opened_on, closed_on = trades["Opened on"].tolist(), trades["Closed on"][closed].tolist()
+        profit_loss = trades["Profit/Loss"].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    closed_bar = np.full(len(profit_loss), -1, dtype=np.int64)
+    closed_bar[closed] = index.get_indexer(closed_on)
+    return index.get_indexer(opened_on), closed_bar, profit_loss
+
+
+def engine_metrics(trades, price_df, total_account, periods_per_year=252, risk_free_rate=0.0):
+
+    """Intakes the output of strategy_engine (the history dataframe or the Trade_Ledger of ledger=True), the price dataframe
+    it was run on and the starting account value; returns Final Balance, Total Profit/Loss, Number of Trades and the
+    returns_metrics of the realized equity curve (P/L is booked on the bar a trade closes), with Win Rate taken over closed
+    trades and Exposure as the share of bars with at least one open position. Max Drawdown is the largest fall of account
+    equity, starting balance included, from its running peak, as a fraction of that peak (0.25 is a 25% drawdown)."""
+
+    n_bars = len(price_df)
+    opened_bar, closed_bar, profit_loss = _trade_bars(trades, price_df.index)
+    closed = closed_bar>=0
+
+    equity = total_account + np.cumsum(np.bincount(closed_bar[closed], weights=profit_loss[closed], minlength=n_bars))
+    #A position counts from its opening bar up to the bar it is closed on, or to the last bar while still open
+    open_positions = np.zeros(n_bars+1, dtype=np.int64)
+    np.add.at(open_positions, opened_bar, 1)
+    np.add.at(open_positions, np.where(closed, closed_bar, n_bars), -1)
+    exposed = np.cumsum(open_positions[:-1])>0
+
+    metrics = equity_metrics(equity, total_account, periods_per_year, risk_free_rate, exposed)
+    metrics["Win Rate"] = np.count_nonzero(profit_loss[closed]>0)/np.count_nonzero(closed) if closed.any() else np.nan
+    final_balance = equity[-1] if n_bars>0 else float(total_account)
+    return pd.concat([pd.Series({"Final Balance": final_balance, "Total Profit/Loss": final_balance-total_account,
+                                 "Number of Trades": len(profit_loss)}), metrics])
@@ -0,0 +1,79 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+from Profiling import profiled
+
+##########################################################################################################################################################################################################################
+
+#Columnar Price Store
+
+def store_path(csv_path):
+
+    """Intakes the path of a price CSV and returns the directory of its columnar store, e.g. AAPL_data.csv -> AAPL_data_store"""
+
+    return os.path.splitext(csv_path)[0]+"_store"
+
+
+@profiled("load/convert_csv")
+def convert_csv(csv_path, store_dir=None, index_col="Date"):
+
+    """Intakes the path of a price CSV with a date column and converts it once into a columnar store: one float64 .npy file
+    per price column, a datetime64 .npy file for the index and a meta.json with the column order.
+    Returns the store directory."""
+
+    if store_dir is None:
+        store_dir = store_path(csv_path)
+    price_df = pd.read_csv(csv_path, index_col=index_col, parse_dates=True)
+
+    os.makedirs(store_dir, exist_ok=True)
+    #Other processes may have the current files memory-mapped, so nothing is overwritten in place: every file is written
+    #under a temporary name and then swapped in with os.replace, which leaves existing maps on the old data
+    files = {"index.npy": price_df.index.to_numpy(dtype="datetime64[ns]")}
+    for i, column in enumerate(price_df.columns):
+        files["column_{}.npy".format(i)] = price_df[column].to_numpy(dtype=np.float64)
+    temporary_paths = {}
+    for name, array in files.items():
+        temporary_paths[name] = os.path.join(store_dir, name+".{}.tmp".format(os.getpid()))
+        with open(temporary_paths[name], "wb") as file:
+            np.save(file, array)
+    meta_path = os.path.join(store_dir, "meta.json")
+    temporary_paths["meta.json"] = meta_path+".{}.tmp".format(os.getpid())
+    with open(temporary_paths["meta.json"], "w") as file:
+        json.dump({"columns": list(price_df.columns), "n_rows": len(price_df)}, file)
+    #meta.json is swapped in last, so an interrupted conversion is redone on the next load
+    for name, temporary_path in temporary_paths.items():
+        os.replace(temporary_path, os.path.join(store_dir, name))
+
+    return store_dir
+
+
+@profiled("load/load_prices")
+def load_prices(path, columns=None, index_col="Date"):
+
+    """Intakes the path of a price CSV or of its columnar store and returns the price dataframe with a DatetimeIndex.
+    A CSV is converted on first use (and again whenever it is newer than its store); afterwards the columns are memory-mapped
+    read-only without copying. columns selects a subset, e.g. ["Open", "High", "Low", "Close"], so unused columns are never
+    read."""
+
+    if os.path.isdir(path):
+        store_dir = path
+    else:
+        store_dir = store_path(path)
+        meta_path = os.path.join(store_dir, "meta.json")
+        if (not os.path.exists(meta_path)) or (os.path.getmtime(meta_path)<os.path.getmtime(path)):
+            convert_csv(path, store_dir, index_col)
+
+    with open(os.path.join(store_dir, "meta.json")) as file:
+        stored_columns = json.load(file)["columns"]
+    if columns is None:
+        columns = stored_columns
+    missing = [column for column in columns if column not in stored_columns]
+    if missing:
+        raise ValueError("columns not found in the price store: {}".format(", ".join(missing)))
+
+    data = {column: np.load(os.path.join(store_dir, "column_{}.npy".format(stored_columns.index(column))), mmap_mode="r")
+            for column in columns}
+    index = pd.DatetimeIndex(np.load(os.path.join(store_dir, "index.npy"), mmap_mode="r"))
+
+    return pd.DataFrame(data, index=index, columns=columns, copy=False)
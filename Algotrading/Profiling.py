@@ -0,0 +1,180 @@
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+##########################################################################################################################################################################################################################
+
+#Stage Registry
+
+#Instrumentation is off by default: profiled functions then call straight through and stage() returns a shared no-op
+#context, so the only cost is one flag check per call
+
+_enabled = False
+_track_memory = False
+_started_tracemalloc = False
+_record_trace = False
+_max_trace_events = 1000000
+_lock = threading.Lock()
+_local = threading.local()
+_stats = {}
+_trace_events = []
+_origin = time.perf_counter()
+_disabled_stage = nullcontext()
+
+
+def enable(memory=False, trace=True, max_trace_events=1000000):
+
+    """Turns the instrumentation on; memory=True also records the peak traced memory of every stage with tracemalloc (which
+    slows the pipeline down), trace=True keeps one event per stage call for export_trace"""
+
+    global _enabled, _track_memory, _started_tracemalloc, _record_trace, _max_trace_events
+    _track_memory = memory
+    _record_trace = trace
+    _max_trace_events = max_trace_events
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracemalloc = True
+    _enabled = True
+
+
+def disable():
+
+    """Turns the instrumentation off; the recorded statistics are kept until reset"""
+
+    global _enabled, _started_tracemalloc
+    _enabled = False
+    if _started_tracemalloc and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _started_tracemalloc = False
+
+
+def reset():
+
+    """Drops all recorded statistics and trace events"""
+
+    global _origin
+    with _lock:
+        _stats.clear()
+        del _trace_events[:]
+    _origin = time.perf_counter()
+
+
+class _Stage:
+
+    """Context manager that times one call of a named stage and folds it into the registry"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        self.memory = _track_memory and tracemalloc.is_tracing()
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1].max_peak = max(stack[-1].max_peak, peak)
+            tracemalloc.reset_peak()
+            self.start_memory = current
+            self.max_peak = current
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end = time.perf_counter()
+        stack = _local.stack
+        stack.pop()
+        peak_bytes = 0
+        if self.memory and tracemalloc.is_tracing():
+            peak = max(self.max_peak, tracemalloc.get_traced_memory()[1])
+            peak_bytes = peak - self.start_memory
+            if stack:
+                stack[-1].max_peak = max(stack[-1].max_peak, peak)
+            tracemalloc.reset_peak()
+
+        with _lock:
+            record = _stats.get(self.name)
+            if record is None:
+                record = _stats[self.name] = {"calls": 0, "total_seconds": 0.0, "max_seconds": 0.0, "peak_memory_bytes": 0}
+            record["calls"] = record["calls"]+1
+            record["total_seconds"] = record["total_seconds"]+(end-self.start)
+            record["max_seconds"] = max(record["max_seconds"], end-self.start)
+            record["peak_memory_bytes"] = max(record["peak_memory_bytes"], peak_bytes)
+            if _record_trace and len(_trace_events)<_max_trace_events:
+                _trace_events.append({"name": self.name, "ph": "X", "ts": (self.start-_origin)*1e6, "dur": (end-self.start)*1e6,
+                                      "pid": os.getpid(), "tid": threading.get_ident()})
+        return False
+
+
+def stage(name):
+
+    """Returns a context manager that records the wall time, call count and peak memory of the enclosed block under name,
+    e.g. with stage("load/AAPL"): ..."""
+
+    if not _enabled:
+        return _disabled_stage
+    return _Stage(name)
+
+
+def profiled(name=None):
+
+    """Decorator that records every call of the function as a stage, under name or the function name"""
+
+    def decorator(function):
+        stage_name = name if name is not None else function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            with _Stage(stage_name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+##########################################################################################################################################################################################################################
+
+#Reports and Export
+
+def stats():
+
+    """Returns {stage name: {"calls", "total_seconds", "max_seconds", "peak_memory_bytes"}} sorted by total time"""
+
+    with _lock:
+        items = sorted(_stats.items(), key=lambda item: item[1]["total_seconds"], reverse=True)
+        return {name: dict(record) for name, record in items}
+
+
+def report():
+
+    """Prints the recorded stages as a table sorted by total time"""
+
+    print("{:<50}{:>8}{:>14}{:>14}{:>14}".format("Stage", "Calls", "Total s", "Max s", "Peak MB"))
+    for name, record in stats().items():
+        print("{:<50}{:>8}{:>14.6f}{:>14.6f}{:>14.3f}".format(name, record["calls"], record["total_seconds"],
+                                                              record["max_seconds"], record["peak_memory_bytes"]/2**20))
+
+
+def export_json(path):
+
+    """Writes the recorded stage statistics to a JSON file"""
+
+    with open(path, "w") as file:
+        json.dump(stats(), file, indent=2)
+
+
+def export_trace(path):
+
+    """Writes the recorded stage calls as a Chrome trace event file, which chrome://tracing, Perfetto and speedscope open as
+    a flame graph"""
+
+    with _lock:
+        events = list(_trace_events)
+    with open(path, "w") as file:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
@@ -1,10 +1,38 @@
 import numpy as np
 import pandas as pd
+from Profiling import profiled
+from Trade_Ledger import LEDGER_COLUMNS, Trade_Ledger, index_times
 
-def strategy_engine(price_df, strategy, total_account, risk_per_trade, total_accepted_risk, close_positions=False):
+def encode_signals(strategy):
 
-    """Intakes a dataframe with Close price of an asset; strategy array that must be the same length as the price dataframe and should contain entries Buy, Sell or None; total account value with which the strategy will be traded; risk per trade that the trader is ready to take; and total accepted risk for all currently open positions.
-    Returns the dataframe with the history of transactions and prints the total account value by end of the simuation, plus the frozen funds that will be unavailable for further transactions due to currently open trades."""
+    """Intakes a strategy array of Buy, Sell or None entries, or an already encoded numeric array, and returns the int8
+    array of +1 (Buy), -1 (Sell) and 0 (None)"""
+    
+    strategy = np.asarray(strategy)
+    if strategy.dtype.kind in "iufb":
+        return np.sign(strategy).astype(np.int8)
+    return (strategy=="Buy").astype(np.int8) - (strategy=="Sell").astype(np.int8)
+
+
+def decode_signals(trading_signals):
+
+    """Intakes an int8 array of +1, -1 and 0 entries and returns the strategy array of Buy, Sell and None"""
+    
+    trading_signals = np.asarray(trading_signals)
+    return np.where(trading_signals>0, "Buy", np.where(trading_signals<0, "Sell", None)).astype(object)
+
+
+@profiled("engine/strategy_engine")
+def strategy_engine(price_df, strategy, total_account, risk_per_trade, total_accepted_risk, close_positions=False, fast=False,
+                    ledger=False):
+
+    """Intakes a dataframe with Close price of an asset; strategy array that must be the same length as the price dataframe and should contain entries Buy, Sell or None (or +1, -1 and 0 as returned by encode_signals); total account value with which the strategy will be traded; risk per trade that the trader is ready to take; and total accepted risk for all currently open positions.
+    Returns the dataframe with the history of transactions and prints the total account value by end of the simuation, plus the frozen funds that will be unavailable for further transactions due to currently open trades.
+    With fast=True the simulation runs on preallocated NumPy arrays and the history dataframe is built once at the end;
+    the columns and P/L are the same, open trades carry NaN in Closing Price and Profit/Loss.
+    With ledger=True (which implies fast) no dataframe is built at all and the trades are returned as a typed Trade_Ledger:
+    Side (+1/-1), Entry Price, Closing Price, Opened on and Closed on (bar timestamps, NaT while open), Number of Shares,
+    Total Investment and Profit/Loss."""
     
     if len(price_df)!=len(strategy):
         raise TypeError("price_df and strategy must have the coinciding number of entries")
@@ -15,6 +43,15 @@ def strategy_engine(price_df, strategy, total_account, risk_per_trade, total_acc
     if (total_accepted_risk<=0) and (1<total_accepted_risk):
         raise ValueError("total_accepted_risk should be a real value in (0,1]")
     
+    if fast==True or ledger==True:
+        trades = _strategy_engine_arrays(price_df, encode_signals(strategy), total_account, risk_per_trade, total_accepted_risk,
+                                         close_positions)
+        if ledger==True:
+            return Trade_Ledger.from_bar_positions(*(trades[name] for name in LEDGER_COLUMNS), times=index_times(price_df.index))
+        return _history_from_ledger(trades, price_df.index)
+    if np.asarray(strategy).dtype.kind in "iufb":
+        strategy = decode_signals(strategy)
+    
     current_open_sells = 0
     current_open_buys = 0
     frozen_funds = 0
@@ -101,4 +138,249 @@ def strategy_engine(price_df, strategy, total_account, risk_per_trade, total_acc
         
     print("Frozen funds:", frozen_funds) 
     print("Total account value:", total_account)
+    return trading_history
+
+
+def _strategy_engine_arrays(price_df, strategy, total_account, risk_per_trade, total_accepted_risk, close_positions):
+
+    """Array-backed implementation of strategy_engine that intakes the encoded strategy array and returns the trade columns
+    with Opened on and Closed on as bar positions.
+    At most one trade is opened per bar, so the ledger is preallocated with len(strategy) rows and open positions are always
+    the trailing rows between first_open and n_trades."""
+    
+    close = price_df["Close"].to_numpy(dtype=np.float64)
+    n = len(close)
+    
+    side = np.zeros(n, dtype=np.int8)
+    entry_price = np.empty(n, dtype=np.float64)
+    closing_price = np.full(n, np.nan, dtype=np.float64)
+    opened_on = np.empty(n, dtype=np.int64)
+    closed_on = np.full(n, -1, dtype=np.int64)
+    n_shares = np.empty(n, dtype=np.float64)
+    total_inv = np.empty(n, dtype=np.float64)
+    profit_loss = np.full(n, np.nan, dtype=np.float64)
+    
+    n_trades = 0
+    first_open = 0
+    frozen_funds = 0
+    bankrupt = False
+    
+    for i in range(0, n):
+        #Check the total balance
+        if total_account<=0:
+            bankrupt = True
+            break
+        
+        direction = strategy[i]
+        if direction==0:
+            continue
+        
+        #Close the open positions of the opposite direction
+        if (n_trades>first_open) and (side[first_open]==-direction):
+            incoming_balance = 0
+            for j in range(first_open, n_trades):
+                closed_on[j] = i
+                closing_price[j] = close[i]
+                if direction==1:
+                    profit_loss[j] = total_inv[j] - closing_price[j]*n_shares[j]
+                else:
+                    profit_loss[j] = closing_price[j]*n_shares[j] - total_inv[j]
+                incoming_balance = incoming_balance+profit_loss[j]
+            total_account = total_account+incoming_balance
+            first_open = n_trades
+            frozen_funds = 0
+        
+        #Open the new position
+        shares = np.floor(total_account*risk_per_trade/close[i])
+        total_investment = close[i]*shares
+        if ((frozen_funds+total_investment)/total_account)<=total_accepted_risk and (total_investment>0):
+            side[n_trades] = direction
+            entry_price[n_trades] = close[i]
+            opened_on[n_trades] = i
+            n_shares[n_trades] = shares
+            total_inv[n_trades] = total_investment
+            n_trades = n_trades+1
+            frozen_funds = frozen_funds+total_investment
+    
+    if bankrupt:
+        print("You are bunkrupt")
+        print("Your final balance is:", total_account)
+    elif close_positions==True:
+        for k in range(first_open, n_trades):
+            closing_price[k] = close[-1]
+            closed_on[k] = n-1
+            if side[k]==1:
+                profit_loss[k] = closing_price[k]*n_shares[k] - total_inv[k]
+            else:
+                profit_loss[k] = total_inv[k] - closing_price[k]*n_shares[k]
+            total_account = total_account+profit_loss[k]
+        frozen_funds = 0
+    
+    if not bankrupt:
+        print("Frozen funds:", frozen_funds)
+        print("Total account value:", total_account)
+    #Compact copies, so the per-bar preallocation is released with the simulation
+    return {"Side": side[:n_trades].copy(), "Entry Price": entry_price[:n_trades].copy(),
+            "Closing Price": closing_price[:n_trades].copy(), "Opened on": opened_on[:n_trades].copy(),
+            "Closed on": closed_on[:n_trades].copy(), "Number of Shares": n_shares[:n_trades].copy(),
+            "Total Investment": total_inv[:n_trades].copy(), "Profit/Loss": profit_loss[:n_trades].copy()}
+
+
+def _history_from_ledger(trades, index):
+
+    """Builds the strategy_engine history dataframe from the trade columns, mapping bar positions to index labels"""
+    
+    closed = trades["Closed on"]
+    closed_dates = np.empty(len(closed), dtype=object)
+    closed_dates[closed>=0] = np.asarray(index[closed[closed>=0]], dtype=object)
+    return pd.DataFrame({"Action": np.where(trades["Side"]==1, "Buy", "Sell").astype(object),
+                         "Entry Price": trades["Entry Price"],
+                         "Closing Price": trades["Closing Price"],
+                         "Opened on": np.asarray(index[trades["Opened on"]], dtype=object),
+                         "Closed on": closed_dates,
+                         "Number of Shares": trades["Number of Shares"],
+                         "Total Investment": trades["Total Investment"],
+                         "Profit/Loss": trades["Profit/Loss"]})
+
+
+@profiled("engine/portfolio_engine")
+def portfolio_engine(price_df, strategy, total_account, risk_per_trade, total_accepted_risk, close_positions=False):
+
+    """Intakes a (time x asset) dataframe of Close prices with one column per asset; a strategy matrix of the same shape with
+    Buy, Sell or None entries (or +1, -1 and 0); the total account value shared by all assets; risk per trade; and total
+    accepted risk for all currently open positions across the assets.
+    Every timestamp is processed for all assets at once: opposite signals close the open positions of their asset first, then
+    new positions are sized on the updated account and accepted in column order while the frozen funds of the whole book stay
+    within total_accepted_risk. A candidate that does not fit reserves nothing, so a later, smaller one can still be accepted.
+    With one asset it reproduces strategy_engine.
+    Returns the dataframe with the history of transactions, with an extra Asset column, and prints the total account value
+    and the frozen funds by the end of the simulation."""
+    
+    close = np.asarray(price_df, dtype=np.float64)
+    signals = encode_signals(strategy)
+    if close.ndim!=2 or close.shape!=signals.shape:
+        raise TypeError("price_df and strategy must be (time x asset) matrices of the same shape")
+    if total_account<=0:
+        raise ValueError("total_account should be a positive real number")
+    if (risk_per_trade<=0) or (1<risk_per_trade):
+        raise ValueError("risk_per_trade should be a real value in (0,1]")
+    if (total_accepted_risk<=0) or (1<total_accepted_risk):
+        raise ValueError("total_accepted_risk should be a real value in (0,1]")
+    
+    n_bars, n_assets = close.shape
+    assets = np.asarray(price_df.columns if isinstance(price_df, pd.DataFrame) else np.arange(n_assets), dtype=object)
+    index = price_df.index if isinstance(price_df, pd.DataFrame) else pd.RangeIndex(n_bars)
+    
+    #Aggregated open position of every asset; all open trades of an asset share the same side
+    open_side = np.zeros(n_assets, dtype=np.int8)
+    open_shares = np.zeros(n_assets, dtype=np.float64)
+    open_investment = np.zeros(n_assets, dtype=np.float64)
+    
+    #Every trade and every position close happens on a nonzero signal, so the ledgers are preallocated to that count
+    max_events = int(np.count_nonzero(signals))
+    trade_asset = np.empty(max_events, dtype=np.int64)
+    trade_opened = np.empty(max_events, dtype=np.int64)
+    trade_side = np.empty(max_events, dtype=np.int8)
+    trade_shares = np.empty(max_events, dtype=np.float64)
+    trade_investment = np.empty(max_events, dtype=np.float64)
+    close_asset = np.empty(max_events, dtype=np.int64)
+    close_bar = np.empty(max_events, dtype=np.int64)
+    n_trades = 0
+    n_closes = 0
+    bankrupt = False
+    
+    for i in np.flatnonzero(signals.any(axis=1)):
+        #Check the total balance
+        if total_account<=0:
+            bankrupt = True
+            break
+        
+        signal = signals[i]
+        price = close[i]
+        
+        #Close the open positions of the assets with an opposite signal
+        closing = np.flatnonzero((signal!=0) & (open_side==-signal))
+        if len(closing)>0:
+            total_account = total_account+np.sum(open_side[closing]*(price[closing]*open_shares[closing]
+                                                                     - open_investment[closing]))
+            close_asset[n_closes:n_closes+len(closing)] = closing
+            close_bar[n_closes:n_closes+len(closing)] = i
+            n_closes = n_closes+len(closing)
+            open_side[closing] = 0
+            open_shares[closing] = 0
+            open_investment[closing] = 0
+        
+        #Open the new positions in column order while the book stays within the accepted risk
+        candidates = np.flatnonzero(signal)
+        shares = np.floor(total_account*risk_per_trade/price[candidates])
+        investment = price[candidates]*shares
+        accepted = investment>0
+        frozen_funds = open_investment.sum() + np.cumsum(np.where(accepted, investment, 0))
+        fits = (frozen_funds/total_account)<=total_accepted_risk
+        rejected = np.flatnonzero(accepted & ~fits)
+        if len(rejected)>0:
+            #Up to the first rejection the running sum is exact; after it, only the accepted candidates add to the book
+            first = rejected[0]
+            frozen = frozen_funds[first-1] if first>0 else open_investment.sum()
+            for k in range(first, len(candidates)):
+                if accepted[k] and ((frozen+investment[k])/total_account)<=total_accepted_risk:
+                    frozen = frozen+investment[k]
+                else:
+                    accepted[k] = False
+        opening = candidates[accepted]
+        n_open = len(opening)
+        if n_open>0:
+            trade_asset[n_trades:n_trades+n_open] = opening
+            trade_opened[n_trades:n_trades+n_open] = i
+            trade_side[n_trades:n_trades+n_open] = signal[opening]
+            trade_shares[n_trades:n_trades+n_open] = shares[accepted]
+            trade_investment[n_trades:n_trades+n_open] = investment[accepted]
+            n_trades = n_trades+n_open
+            open_side[opening] = signal[opening]
+            open_shares[opening] = open_shares[opening]+shares[accepted]
+            open_investment[opening] = open_investment[opening]+investment[accepted]
+    
+    trade_asset = trade_asset[:n_trades]
+    trade_opened = trade_opened[:n_trades]
+    trade_side = trade_side[:n_trades]
+    trade_shares = trade_shares[:n_trades]
+    trade_investment = trade_investment[:n_trades]
+    
+    #Each trade is closed by the first close of its asset after it was opened
+    close_key = close_asset[:n_closes]*(n_bars+1) + close_bar[:n_closes]
+    order = np.argsort(close_key, kind="stable")
+    close_key = close_key[order]
+    position = np.searchsorted(close_key, trade_asset*(n_bars+1) + trade_opened, side="right")
+    found = position<n_closes
+    found[found] = (close_key[position[found]]//(n_bars+1))==trade_asset[found]
+    trade_closed = np.full(n_trades, -1, dtype=np.int64)
+    trade_closed[found] = close_key[position[found]]%(n_bars+1)
+    
+    if close_positions==True and not bankrupt:
+        still_open = trade_closed<0
+        trade_closed[still_open] = n_bars-1
+        total_account = total_account+np.sum(open_side*(close[-1]*open_shares - open_investment))
+        open_investment[:] = 0
+    
+    is_closed = trade_closed>=0
+    closing_price = np.full(n_trades, np.nan)
+    closing_price[is_closed] = close[trade_closed[is_closed], trade_asset[is_closed]]
+    closed_dates = np.empty(n_trades, dtype=object)
+    closed_dates[is_closed] = np.asarray(index[trade_closed[is_closed]], dtype=object)
+    trading_history = pd.DataFrame({"Asset": assets[trade_asset],
+                                    "Action": np.where(trade_side==1, "Buy", "Sell").astype(object),
+                                    "Entry Price": close[trade_opened, trade_asset],
+                                    "Closing Price": closing_price,
+                                    "Opened on": np.asarray(index[trade_opened], dtype=object),
+                                    "Closed on": closed_dates,
+                                    "Number of Shares": trade_shares,
+                                    "Total Investment": trade_investment,
+                                    "Profit/Loss": trade_side*(closing_price*trade_shares - trade_investment)})
+    
+    if bankrupt:
+        print("You are bunkrupt")
+        print("Your final balance is:", total_account)
+    else:
+        print("Frozen funds:", open_investment.sum())
+        print("Total account value:", total_account)
     return trading_history
\ No newline at end of file
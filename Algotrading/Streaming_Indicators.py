@@ -0,0 +1,375 @@
+import math
+from collections import deque
+from numbers import Real
+
+##########################################################################################################################################################################################################################
+
+#Streaming Helpers
+
+def _bar_value(bar, field="Close"):
+
+    """Intakes a bar given as a number (taken as the Close price) or as a mapping/Series with price fields and returns the
+    requested field as float"""
+
+    if isinstance(bar, Real):
+        if field!="Close":
+            raise ValueError("{} price requires a bar with High, Low and Close fields".format(field))
+        return float(bar)
+    return float(bar[field])
+
+
+def _divide(numerator, denominator):
+
+    """Float division that follows NumPy semantics: x/0 gives +-inf and 0/0 gives NaN"""
+
+    if denominator==0:
+        if numerator==0 or math.isnan(numerator):
+            return math.nan
+        return math.copysign(math.inf, numerator)
+    return numerator/denominator
+
+
+class _Recursive_Filter_Stream:
+
+    """Incremental counterpart of Technical_Indicators._recursive_filter: the n-th update returns the n-th entry of the
+    SMA-seeded recurrence out[i] = value*multiplier + out[i-1]*(1-multiplier)"""
+
+    def __init__(self, multiplier, seed_start, seed_end):
+        self.multiplier = multiplier
+        self.seed_start = seed_start
+        self.seed_end = seed_end
+        self.n_updates = 0
+        self.seed_sum = 0.0
+        self.seed_count = 0
+        self.value = math.nan
+
+    def update(self, value):
+        i = self.n_updates
+        self.n_updates = i+1
+        if i<self.seed_start:
+            return math.nan
+        if i<self.seed_end:
+            if not math.isnan(value):
+                self.seed_sum = self.seed_sum+value
+                self.seed_count = self.seed_count+1
+            if i==self.seed_end-1:
+                self.value = self.seed_sum/self.seed_count if self.seed_count>0 else math.nan
+                return self.value
+            return math.nan
+        self.value = value*self.multiplier + self.value*(1-self.multiplier)
+        return self.value
+
+##########################################################################################################################################################################################################################
+
+#Rolling Window Steps
+
+#A rolling window state is a sequence of floats with these fields; the steps below work the same on a list (the streams)
+#and on a float64 array compiled by numba (Technical_Indicators.rolling_moments), so batch and streaming values are the
+#same to the last bit
+#The steps copy the private rolling kernels of pandas 1.5.3 (pandas/_libs/window/aggregations.pyx). The tests compare them
+#with pandas rolling bit for bit, so a pandas upgrade that changes those kernels fails there instead of drifting silently
+(_N_OBS, _N_NEGATIVE, _N_SAME, _PREVIOUS, _SUM, _SUM_ADD_COMPENSATION, _SUM_REMOVE_COMPENSATION, _MEAN, _SSQDM,
+ _VAR_ADD_COMPENSATION, _VAR_REMOVE_COMPENSATION) = range(11)
+WINDOW_STATE_SIZE = 11
+
+
+def _window_reset(state):
+
+    """Empties a rolling window state"""
+
+    for field in range(WINDOW_STATE_SIZE):
+        state[field] = 0.0
+    state[_PREVIOUS] = math.nan
+
+
+def _window_add(state, value):
+
+    """Adds value to the window: Kahan summation for the mean and Welford with Kahan compensation for the variance, as in
+    add_mean and add_var of pandas 1.5.3 (pandas/_libs/window/aggregations.pyx); NaN values are skipped"""
+
+    if math.isnan(value):
+        return
+    n_obs = state[_N_OBS]+1
+    state[_N_OBS] = n_obs
+    if math.copysign(1.0, value)<0:
+        state[_N_NEGATIVE] = state[_N_NEGATIVE]+1
+    if value==state[_PREVIOUS]:
+        state[_N_SAME] = state[_N_SAME]+1
+    else:
+        state[_N_SAME] = 1.0
+    state[_PREVIOUS] = value
+
+    y = value - state[_SUM_ADD_COMPENSATION]
+    t = state[_SUM] + y
+    state[_SUM_ADD_COMPENSATION] = t - state[_SUM] - y
+    state[_SUM] = t
+
+    mean = state[_MEAN]
+    previous_mean = mean - state[_VAR_ADD_COMPENSATION]
+    y = value - state[_VAR_ADD_COMPENSATION]
+    t = y - mean
+    state[_VAR_ADD_COMPENSATION] = t + mean - y
+    mean = mean + t/n_obs
+    state[_MEAN] = mean
+    state[_SSQDM] = state[_SSQDM] + (value-previous_mean)*(value-mean)
+
+
+def _window_remove(state, value):
+
+    """Removes value from the window, as remove_mean and remove_var of pandas 1.5.3; NaN values are skipped"""
+
+    if math.isnan(value):
+        return
+    n_obs = state[_N_OBS]-1
+    state[_N_OBS] = n_obs
+    if math.copysign(1.0, value)<0:
+        state[_N_NEGATIVE] = state[_N_NEGATIVE]-1
+
+    y = -value - state[_SUM_REMOVE_COMPENSATION]
+    t = state[_SUM] + y
+    state[_SUM_REMOVE_COMPENSATION] = t - state[_SUM] - y
+    state[_SUM] = t
+
+    if n_obs==0:
+        state[_MEAN] = 0.0
+        state[_SSQDM] = 0.0
+        return
+    mean = state[_MEAN]
+    previous_mean = mean - state[_VAR_REMOVE_COMPENSATION]
+    y = value - state[_VAR_REMOVE_COMPENSATION]
+    t = y - mean
+    state[_VAR_REMOVE_COMPENSATION] = t + mean - y
+    mean = mean - t/n_obs
+    state[_MEAN] = mean
+    state[_SSQDM] = state[_SSQDM] - (value-previous_mean)*(value-mean)
+
+
+def _window_mean(state, period):
+
+    """Returns the mean of a window of period values, NaN until it holds period values that are not NaN (calc_mean)"""
+
+    n_obs = state[_N_OBS]
+    if n_obs<period:
+        return math.nan
+    if state[_N_SAME]>=n_obs:
+        return state[_PREVIOUS]
+    mean = state[_SUM]/n_obs
+    #Rounding cannot push the mean of values of one sign across zero
+    if (state[_N_NEGATIVE]==0 and mean<0) or (state[_N_NEGATIVE]==n_obs and mean>0):
+        return 0.0
+    return mean
+
+
+def _window_std(state, period):
+
+    """Returns the sample standard deviation of a window of period values, NaN until it holds period values that are not
+    NaN and for single values (calc_var)"""
+
+    n_obs = state[_N_OBS]
+    if n_obs<period or n_obs<2:
+        return math.nan
+    if state[_N_SAME]>=n_obs:
+        return 0.0
+    return math.sqrt(max(state[_SSQDM]/(n_obs-1), 0.0))
+
+
+class _Rolling_Window_Stream:
+
+    """Rolling mean and sample standard deviation over the last period values, updated in O(1) per value with the rolling
+    window steps"""
+
+    def __init__(self, period):
+        self.period = period
+        self.window = deque()
+        self.state = [0.0]*WINDOW_STATE_SIZE
+        _window_reset(self.state)
+
+    def update(self, value):
+        self.window.append(value)
+        if len(self.window)>self.period:
+            _window_remove(self.state, self.window.popleft())
+        _window_add(self.state, value)
+
+    def ready(self):
+        return self.state[_N_OBS]==self.period
+
+    def get_mean(self):
+        return _window_mean(self.state, self.period)
+
+    def get_std(self):
+        return _window_std(self.state, self.period)
+
+##########################################################################################################################################################################################################################
+
+#Streaming Indicators
+
+class SMA_Stream:
+
+    """Incremental SMA: update(bar) returns the latest value of Technical_Indicators.SMA"""
+
+    def __init__(self, period=15):
+        self.rolling = _Rolling_Window_Stream(period)
+
+    def update(self, bar):
+        self.rolling.update(_bar_value(bar))
+        return self.rolling.get_mean()
+
+
+class EMA_Stream:
+
+    """Incremental EMA: update(bar) returns the latest value of Technical_Indicators.EMA"""
+
+    def __init__(self, period=20, smoothing=2):
+        self.filter = _Recursive_Filter_Stream(smoothing/(1+period), 0, period)
+
+    def update(self, bar):
+        return self.filter.update(_bar_value(bar))
+
+
+class Bollinger_Bands_Stream:
+
+    """Incremental Bollinger Bands: update(bar) returns the latest (SMA, Upper Band, Lower Band) of
+    Technical_Indicators.Bollinger_Bands"""
+
+    def __init__(self, period=50, n_deviations=2):
+        self.n_deviations = n_deviations
+        self.rolling = _Rolling_Window_Stream(period)
+
+    def update(self, bar):
+        self.rolling.update(_bar_value(bar))
+        sma = self.rolling.get_mean()
+        band_width = self.rolling.get_std()*self.n_deviations
+        return sma, sma+band_width, sma-band_width
+
+
+class MACD_Stream:
+
+    """Incremental MACD: update(bar) returns the latest (MACD, MACD Signal Line, MACD Histogram) of Technical_Indicators.MACD"""
+
+    def __init__(self, small_ema=12, large_ema=26, signal_line=9, smoothing=2):
+        if large_ema<=small_ema:
+            raise ValueError("large_ema has to be larger than small_ema")
+        self.small_filter = _Recursive_Filter_Stream(smoothing/(1+small_ema), 0, small_ema)
+        self.large_filter = _Recursive_Filter_Stream(smoothing/(1+large_ema), 0, large_ema)
+        self.signal_filter = _Recursive_Filter_Stream(smoothing/(1+signal_line), large_ema-1, large_ema-1+signal_line)
+
+    def update(self, bar):
+        close = _bar_value(bar)
+        macd = self.small_filter.update(close) - self.large_filter.update(close)
+        macd_signal_line = self.signal_filter.update(macd)
+        return macd, macd_signal_line, macd-macd_signal_line
+
+
+class RSI_Stream:
+
+    """Incremental RSI: update(bar) returns the latest value of Technical_Indicators.RSI"""
+
+    def __init__(self, period=14):
+        self.previous_close = None
+        self.up_filter = _Recursive_Filter_Stream(1/period, 1, period+1)
+        self.down_filter = _Recursive_Filter_Stream(1/period, 1, period+1)
+
+    def update(self, bar):
+        close = _bar_value(bar)
+        if self.previous_close is None:
+            up = down = math.nan
+        else:
+            change = close - self.previous_close
+            up = change if change>=0 else 0.0
+            down = -change if change<0 else 0.0
+        self.previous_close = close
+
+        up_smma = self.up_filter.update(up)
+        down_smma = self.down_filter.update(down)
+        return 100 - 100/(1+_divide(up_smma, down_smma))
+
+
+class ADX_Stream:
+
+    """Incremental ADX: update(bar) intakes a bar with High, Low and Close fields and returns the latest (+DI, -DI, ADX) of
+    Technical_Indicators.ADX"""
+
+    def __init__(self, period=14):
+        self.previous_bar = None
+        self.atr_filter = _Recursive_Filter_Stream(1/period, 0, period)
+        self.plus_dm_filter = _Recursive_Filter_Stream(1/period, 1, period+1)
+        self.minus_dm_filter = _Recursive_Filter_Stream(1/period, 1, period+1)
+        self.adx_filter = _Recursive_Filter_Stream(1/period, period, 2*period+1)
+
+    def update(self, bar):
+        high = _bar_value(bar, "High")
+        low = _bar_value(bar, "Low")
+        close = _bar_value(bar, "Close")
+        if self.previous_bar is None:
+            plus_dm = minus_dm = true_range = math.nan
+        else:
+            previous_high, previous_low, previous_close = self.previous_bar
+            up_move = high - previous_high
+            down_move = previous_low - low
+            plus_dm = up_move if (up_move>down_move) and (up_move>0) else 0.0
+            minus_dm = down_move if (down_move>up_move) and (down_move>0) else 0.0
+            true_range = max(high, previous_close) - min(low, previous_close)
+        self.previous_bar = (high, low, close)
+
+        atr = self.atr_filter.update(true_range)
+        plus_di = self.plus_dm_filter.update(plus_dm)*_divide(100, atr)
+        minus_di = self.minus_dm_filter.update(minus_dm)*_divide(100, atr)
+        adx = self.adx_filter.update(abs(plus_di-minus_di))*_divide(100, plus_di+minus_di)
+        return plus_di, minus_di, adx
+
+##########################################################################################################################################################################################################################
+
+#Streaming Signals
+
+def _signal(direction, encoded):
+
+    """Returns the +1/-1/0 direction as is when encoded, otherwise as Buy, Sell or None"""
+
+    if encoded:
+        return direction
+    return "Buy" if direction>0 else ("Sell" if direction<0 else None)
+
+
+class Golden_Cross_Death_Cross_Stream:
+
+    """Incremental golden_cross_death_cross: update(bar) returns the signal of the latest bar, Buy on the Golden Cross and
+    Sell on the Death Cross (+1/-1/0 with encoded=True)"""
+
+    def __init__(self, encoded=False):
+        self.encoded = encoded
+        self.large_sma = SMA_Stream(200)
+        self.small_sma = SMA_Stream(50)
+        self.previous = (math.nan, math.nan)
+
+    def update(self, bar):
+        close = _bar_value(bar)
+        large = self.large_sma.update(close)
+        small = self.small_sma.update(close)
+        previous_large, previous_small = self.previous
+        self.previous = (large, small)
+
+        if (previous_large>previous_small) and (large<small):
+            return _signal(1, self.encoded)
+        if (previous_large<previous_small) and (large>small):
+            return _signal(-1, self.encoded)
+        return _signal(0, self.encoded)
+
+
+class Boll_Buy_Lower_Sell_Upper_Stream:
+
+    """Incremental boll_buy_lower_sell_upper: update(bar) returns the signal of the latest bar, Buy when Close touches the
+    Lower Band and Sell when Close touches the Upper Band (+1/-1/0 with encoded=True)"""
+
+    def __init__(self, sma_number=50, n_deviations=2, encoded=False):
+        self.encoded = encoded
+        self.bands = Bollinger_Bands_Stream(sma_number, n_deviations)
+
+    def update(self, bar):
+        close = _bar_value(bar)
+        sma, upper_band, lower_band = self.bands.update(close)
+
+        if close<=lower_band:
+            return _signal(1, self.encoded)
+        if close>=upper_band:
+            return _signal(-1, self.encoded)
+        return _signal(0, self.encoded)
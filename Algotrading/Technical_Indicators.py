@@ -1,8 +1,362 @@
 import numpy as np
 import pandas as pd
-import plotly.express as px
-from plotly.subplots import make_subplots
-import plotly.graph_objects as go
+from Indicator_Cache import cached_indicator
+from Profiling import profiled
+from Streaming_Indicators import WINDOW_STATE_SIZE, _window_add, _window_mean, _window_remove, _window_reset, _window_std
+
+#scipy.signal takes the better part of a second to import, so it is only loaded by the first recursive filter call
+_lfilter = None
+
+
+def _load_lfilter():
+    
+    """Returns scipy.signal.lfilter, imported on first use, or None when scipy is not installed"""
+    
+    global _lfilter
+    if _lfilter is None:
+        try:
+            from scipy.signal import lfilter
+        except ImportError:
+            lfilter = False
+        _lfilter = lfilter
+    return _lfilter or None
+
+
+_rolling_kernel = None
+
+
+def _load_rolling_kernel():
+    
+    """Returns the rolling moments sweep compiled by numba on first use, or None when numba is not installed"""
+    
+    global _rolling_kernel
+    if _rolling_kernel is None:
+        try:
+            from numba import njit
+        except ImportError:
+            _rolling_kernel = False
+        else:
+            steps = [njit(step) for step in (_window_reset, _window_add, _window_remove, _window_mean, _window_std)]
+            _rolling_kernel = njit(nogil=True)(_rolling_sweep(*steps))
+    return _rolling_kernel or None
+
+##########################################################################################################################################################################################################################
+
+#Recursive Filter Kernel
+
+def _recursive_filter(values, multiplier, seed_start, seed_end, out=None):
+    
+    """Intakes a float array and runs the recurrence out[i] = values[i]*multiplier + out[i-1]*(1-multiplier) over it
+    The recurrence is seeded at seed_end-1 with the mean of values[seed_start:seed_end] and entries before the seed are NaN;
+    multiplier=smoothing/(1+period) gives the SMA-seeded EMA and multiplier=1/period gives Wilder's SMMA.
+    A 2-D (time x ticker) array is filtered column by column along the time axis in the same pass.
+    The result is written into out when given, which may be values itself"""
+    
+    values = np.asarray(values, dtype=np.float64)
+    if out is None:
+        out = np.empty(values.shape)
+    if seed_end>len(values):
+        out[:] = np.nan
+        return out
+    
+    seed = np.nanmean(values[seed_start:seed_end], axis=0)
+    lfilter = _load_lfilter()
+    if lfilter is not None:
+        if seed_end<len(values):
+            out[seed_end:] = lfilter([multiplier], [1, multiplier-1], values[seed_end:], axis=0,
+                                     zi=np.asarray((1-multiplier)*seed)[np.newaxis])[0]
+    else:
+        previous = seed
+        for i in range(seed_end, len(values)):
+            previous = values[i]*multiplier + previous*(1-multiplier)
+            out[i] = previous
+    out[:seed_end-1] = np.nan
+    out[seed_end-1] = seed
+    
+    return out
+
+##########################################################################################################################################################################################################################
+
+#Cached Rolling Statistics
+
+def _rolling_sweep(window_reset, window_add, window_remove, window_mean, window_std):
+    
+    """Intakes the rolling window steps of Streaming_Indicators (plain or compiled) and returns the sweep built on them, which
+    runs over a (time x ticker) array once and updates one window state per window length at every value, writing the
+    (k x time x ticker) means and, with with_std, the standard deviations"""
+    
+    def sweep(values, windows, means, stds, with_std):
+        states = np.empty((len(windows), WINDOW_STATE_SIZE))
+        for column in range(values.shape[1]):
+            for j in range(len(windows)):
+                window_reset(states[j])
+            for i in range(values.shape[0]):
+                for j in range(len(windows)):
+                    #As in pandas, the value leaving the window is removed before the new one is added
+                    if i>=windows[j]:
+                        window_remove(states[j], values[i-windows[j], column])
+                    window_add(states[j], values[i, column])
+                    means[j, i, column] = window_mean(states[j], windows[j])
+                    if with_std:
+                        stds[j, i, column] = window_std(states[j], windows[j])
+    
+    return sweep
+
+
+def _rolling_moments(close, windows, with_std, means=None, stds=None):
+    
+    """Returns (k x time[ x ticker]) arrays of the rolling means and, with with_std, the rolling sample standard deviations of
+    a 1-D or (time x ticker) float64 array for k window lengths, written into means and stds when they are given; windows
+    containing a NaN give NaN"""
+    
+    if min(windows)<1:
+        raise ValueError("window lengths should be at least 1")
+    if means is None:
+        means = np.empty((len(windows),)+close.shape)
+    if with_std and stds is None:
+        stds = np.empty((len(windows),)+close.shape)
+    
+    #The compensated add/remove steps give exactly 0 for flat windows and the exact value as their mean, so band touches
+    #and SMA crossings on tick-rounded prices come out as with pandas rolling and in Streaming_Indicators
+    sweep = _load_rolling_kernel()
+    if sweep is not None:
+        as_panel = (lambda array: array) if close.ndim==2 else (lambda array: array[..., np.newaxis])
+        sweep(as_panel(close), np.array(windows, dtype=np.int64), as_panel(means), as_panel(stds if with_std else means),
+              with_std)
+    else:
+        #pandas rolling runs the same steps in C, one pass per window and moment
+        frame = pd.DataFrame(close, copy=False) if close.ndim==2 else pd.Series(close, copy=False)
+        for j, window in enumerate(windows):
+            rolling_close = frame.rolling(window=window)
+            means[j] = rolling_close.mean().to_numpy()
+            if with_std:
+                stds[j] = rolling_close.std().to_numpy()
+    
+    return means, stds
+
+
+def rolling_moments(close, windows, std=False):
+    
+    """Intakes a 1-D or (time x ticker) Close price array and one or several window lengths, e.g. (50, 200), and returns the
+    read-only (windows x time[ x ticker]) array of rolling means, plus the array of rolling standard deviations when std is
+    True. All windows and both moments come out of one compensated sweep over the data, compiled with numba when it is
+    installed, and give the values of pandas rolling; every window set is computed once per distinct data and then served
+    from the indicator cache."""
+    
+    close = np.asarray(close, dtype=np.float64)
+    windows = tuple(int(window) for window in np.atleast_1d(windows))
+    if std:
+        return cached_indicator("Rolling Mean and Std", {"windows": windows}, close,
+                                lambda: _rolling_moments(close, windows, True))
+    return cached_indicator("Rolling Mean", {"windows": windows}, close, lambda: _rolling_moments(close, windows, False)[0])
+
+
+def rolling_mean(close, period):
+    
+    """Intakes a Close price series and returns the read-only array of its rolling mean over period, computed once per
+    distinct data and period and then served from the indicator cache"""
+    
+    return rolling_moments(close, period)[0]
+
+
+def rolling_mean_std(close, period):
+    
+    """Intakes a Close price series and returns the read-only arrays of its rolling mean and rolling standard deviation over
+    period, served from the indicator cache"""
+    
+    means, stds = rolling_moments(close, period, std=True)
+    return means[0], stds[0]
+
+##########################################################################################################################################################################################################################
+
+#Non-Mutating Indicator Values
+
+#The *_values functions intake price series or arrays (1-D, or time x ticker for the batch variants) and never modify them.
+#They return float64 Series indexed like the input Series, or arrays otherwise. When out is given the results are written
+#into it: shape of the input for one-output indicators, (3,) + shape of the input for three-output indicators. SMA and
+#Bollinger Bands then compute straight into out and bypass the indicator cache; without out they are served from it.
+
+def _output(out, shape, n_outputs=1):
+    
+    """Returns the caller-supplied output buffer after checking its shape, or a new uninitialized float64 buffer"""
+    
+    shape = shape if n_outputs==1 else (n_outputs,)+shape
+    if out is None:
+        return np.empty(shape)
+    if out.shape!=shape or out.dtype!=np.float64:
+        raise ValueError("out must be a float64 array of shape {}".format(shape))
+    return out
+
+
+def _wrap(values, index, name):
+    
+    """Returns values as a Series over index without copying, or as is when the input was not a Series"""
+    
+    if index is None:
+        return values
+    return pd.Series(values, index=index, name=name, copy=False)
+
+
+@profiled("indicators/SMA")
+def SMA_values(close, period=15, out=None):
+    
+    """Intakes a Close price series and returns its SMA"""
+    
+    index = close.index if isinstance(close, pd.Series) else None
+    if out is None:
+        sma = rolling_mean(close, period)
+        out = _output(out, sma.shape)
+        np.copyto(out, sma)
+    else:
+        #The caller's buffer is filled directly and nothing is cached, so no other column is held
+        close = np.asarray(close, dtype=np.float64)
+        _rolling_moments(close, (period,), False, means=_output(out, close.shape)[np.newaxis])
+    
+    return _wrap(out, index, "{} SMA".format(period))
+
+
+@profiled("indicators/EMA")
+def EMA_values(close, period=20, smoothing=2, out=None):
+    
+    """Intakes a Close price series and returns its EMA"""
+    
+    index = close.index if isinstance(close, pd.Series) else None
+    close = np.asarray(close, dtype=np.float64)
+    out = _recursive_filter(close, smoothing/(1+period), 0, period, out=_output(out, close.shape))
+    
+    return _wrap(out, index, "{} EMA".format(period))
+
+
+@profiled("indicators/MACD")
+def MACD_values(close, small_ema=12, large_ema=26, signal_line=9, smoothing=2, out=None):
+    
+    """Intakes a Close price series and returns its MACD, MACD Signal Line and MACD Histogram"""
+    
+    if large_ema<=small_ema:
+        raise ValueError("large_ema has to be larger than small_ema")
+    
+    index = close.index if isinstance(close, pd.Series) else None
+    close = np.asarray(close, dtype=np.float64)
+    out = _output(out, close.shape, 3)
+    macd, macd_signal_line, macd_histogram = out
+    
+    #The large EMA is kept in the histogram buffer until MACD is known
+    _recursive_filter(close, smoothing/(1+small_ema), 0, small_ema, out=macd)
+    _recursive_filter(close, smoothing/(1+large_ema), 0, large_ema, out=macd_histogram)
+    np.subtract(macd, macd_histogram, out=macd)
+    _recursive_filter(macd, smoothing/(1+signal_line), large_ema-1, large_ema-1+signal_line, out=macd_signal_line)
+    np.subtract(macd, macd_signal_line, out=macd_histogram)
+    
+    return (_wrap(macd, index, "MACD"), _wrap(macd_signal_line, index, "MACD Signal Line"),
+            _wrap(macd_histogram, index, "MACD Histogram"))
+
+
+@profiled("indicators/Bollinger_Bands")
+def Bollinger_Bands_values(close, period=50, n_deviations=2, out=None):
+    
+    """Intakes a Close price series and returns its SMA, Upper Band and Lower Band"""
+    
+    index = close.index if isinstance(close, pd.Series) else None
+    if out is None:
+        sma, rolling_std = rolling_mean_std(close, period)
+        out = _output(out, sma.shape, 3)
+        np.copyto(out[0], sma)
+        np.copyto(out[2], rolling_std)
+    else:
+        #The SMA and the rolling std are computed into the SMA and Lower Band buffers and nothing is cached
+        close = np.asarray(close, dtype=np.float64)
+        out = _output(out, close.shape, 3)
+        _rolling_moments(close, (period,), True, means=out[0:1], stds=out[2:3])
+    
+    np.multiply(out[2], n_deviations, out=out[2])
+    np.add(out[0], out[2], out=out[1])
+    np.subtract(out[0], out[2], out=out[2])
+    
+    return _wrap(out[0], index, "SMA"), _wrap(out[1], index, "Upper Band"), _wrap(out[2], index, "Lower Band")
+
+
+@profiled("indicators/RSI")
+def RSI_values(close, period=14, out=None):
+    
+    """Intakes a Close price series and returns its RSI"""
+    
+    index = close.index if isinstance(close, pd.Series) else None
+    close = np.asarray(close, dtype=np.float64)
+    out = _output(out, close.shape)
+    
+    #D starts as the price change; U is built in the output buffer
+    down = np.empty(close.shape)
+    down[:1] = np.nan
+    np.subtract(close[1:], close[:-1], out=down[1:])
+    np.maximum(down, 0, out=out)
+    np.minimum(down, 0, out=down)
+    np.negative(down, out=down)
+    
+    #U SMMA and D SMMA
+    _recursive_filter(out, 1/period, 1, period+1, out=out)
+    _recursive_filter(down, 1/period, 1, period+1, out=down)
+    
+    #RSI = 100 - 100/(1+RS)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(out, down, out=out)
+        np.add(out, 1, out=out)
+        np.divide(100, out, out=out)
+        np.subtract(100, out, out=out)
+    
+    return _wrap(out, index, "RSI")
+
+
+@profiled("indicators/ADX")
+def ADX_values(high, low, close, period=14, out=None):
+    
+    """Intakes High, Low and Close price series and returns their +DI, -DI and ADX"""
+    
+    index = close.index if isinstance(close, pd.Series) else None
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    out = _output(out, close.shape, 3)
+    plus_di, minus_di, adx = out
+    atr = np.empty(close.shape)
+    
+    #+DM and -DM are built from the up and down moves in the +DI and -DI buffers
+    up_move, down_move = plus_di, minus_di
+    up_move[:1] = np.nan
+    down_move[:1] = np.nan
+    np.subtract(high[1:], high[:-1], out=up_move[1:])
+    np.subtract(low[:-1], low[1:], out=down_move[1:])
+    plus_dm_mask = (up_move>down_move) & (up_move>0)
+    minus_dm_mask = (down_move>up_move) & (down_move>0)
+    np.copyto(up_move, 0, where=~plus_dm_mask)
+    np.copyto(down_move, 0, where=~minus_dm_mask)
+    up_move[:1] = np.nan
+    down_move[:1] = np.nan
+    
+    #TR is built in the ADX buffer
+    true_range = adx
+    true_range[:1] = np.nan
+    np.maximum(high[1:], close[:-1], out=true_range[1:])
+    np.minimum(low[1:], close[:-1], out=atr[1:])
+    np.subtract(true_range[1:], atr[1:], out=true_range[1:])
+    
+    _recursive_filter(true_range, 1/period, 0, period, out=atr)
+    _recursive_filter(up_move, 1/period, 1, period+1, out=plus_di)
+    _recursive_filter(down_move, 1/period, 1, period+1, out=minus_di)
+    
+    with np.errstate(divide="ignore", invalid="ignore"):
+        #+DI = +DM SMMA*(100/ATR) and -DI = -DM SMMA*(100/ATR)
+        np.divide(100, atr, out=atr)
+        np.multiply(plus_di, atr, out=plus_di)
+        np.multiply(minus_di, atr, out=minus_di)
+        #ADX = SMMA(|+DI - -DI|)*(100/(+DI + -DI))
+        np.subtract(plus_di, minus_di, out=adx)
+        np.abs(adx, out=adx)
+        _recursive_filter(adx, 1/period, period, 2*period+1, out=adx)
+        np.add(plus_di, minus_di, out=atr)
+        np.divide(100, atr, out=atr)
+        np.multiply(adx, atr, out=adx)
+    
+    return _wrap(plus_di, index, "+DI"), _wrap(minus_di, index, "-DI"), _wrap(adx, index, "ADX")
 
 ##########################################################################################################################################################################################################################
 
@@ -14,7 +368,7 @@ def SMA(df, period=15):
     SMA is the simple moving average that describes the direction of the trend, and computed using the
     mean over the certain period"""
     
-    df["{} SMA".format(period)] = df["Close"].rolling(window=period).mean()
+    df["{} SMA".format(period)] = SMA_values(df["Close"], period)
     
     return df
 
@@ -28,13 +382,7 @@ def EMA(df, period=20, smoothing=2):
     EMA is the exponential moving average that describes the direction of the trend, and is requires previous EMA and the latest
     Close price to compute; the first EMA will be same as SMA"""
     
-    multiplier = smoothing/(1+period)
-    df["{} EMA".format(period)] = np.nan
-    
-    df["{} EMA".format(period)].iloc[period-1] = df["Close"].iloc[0:period].mean()
-    for i in range(period, len(df)):
-        df["{} EMA".format(period)].iloc[i] = (df["Close"].iloc[i]*multiplier
-                                               + df["{} EMA".format(period)].iloc[i-1]*(1-multiplier))
+    df["{} EMA".format(period)] = EMA_values(df["Close"], period, smoothing)
     
     return df
 
@@ -44,40 +392,12 @@ def EMA(df, period=20, smoothing=2):
 
 def MACD(df, small_ema=12, large_ema=26, signal_line=9, smoothing=2):
     
-    """"""
-    
-    if large_ema<=small_ema:
-        raise ValueError("large_ema has to be larger than small_ema")
-    
-    macd_df = pd.DataFrame(index=df.index, columns=["{} EMA".format(small_ema), "{} EMA".format(large_ema), "MACD",
-                                                    "MACD Signal Line", "MACD Histogram"])
+    """Intakes a price dataframe and returns MACD, MACD Signal Line and MACD Histogram columns
+    MACD is the difference between the small and the large EMA, the signal line is the EMA of MACD seeded once the large EMA
+    is available, and the histogram is the difference between MACD and its signal line"""
     
-    small_ema_mult = smoothing/(1+small_ema)
-    large_ema_mult = smoothing/(1+large_ema)
-    signal_line_mult = smoothing/(1+signal_line)
-    
-    macd_df.iloc[small_ema-1, 0] = df["Close"].iloc[0:small_ema].mean()
-    for i in range(small_ema, len(df)):
-        macd_df.iloc[i, 0] = (df["Close"].iloc[i]*small_ema_mult
-                              + macd_df["{} EMA".format(small_ema)].iloc[i-1]*(1-small_ema_mult))
-    
-    macd_df.iloc[large_ema-1, 1] = df["Close"].iloc[:large_ema].mean()
-    for i in range(large_ema, len(df)):
-        macd_df.iloc[i, 1] = (df["Close"].iloc[i]*large_ema_mult
-                              + macd_df["{} EMA".format(large_ema)].iloc[i-1]*(1-large_ema_mult))
-    
-    macd_df["MACD"] = macd_df["{} EMA".format(small_ema)] - macd_df["{} EMA".format(large_ema)]
-    
-    macd_df.iloc[large_ema-2+signal_line, 3] = macd_df["MACD"].iloc[large_ema-1:large_ema-1+signal_line].mean()
-    for i in range(large_ema-1+signal_line, len(macd_df)):
-        macd_df.iloc[i, 3] = (macd_df["MACD"].iloc[i]*signal_line_mult
-                              + macd_df["MACD Signal Line"].iloc[i-1]*(1-signal_line_mult))
-    
-    macd_df["MACD Histogram"] = macd_df["MACD"] - macd_df["MACD Signal Line"]
-    
-    df["MACD"] = macd_df["MACD"]
-    df["MACD Signal Line"] = macd_df["MACD Signal Line"]
-    df["MACD Histogram"] = macd_df["MACD Histogram"]
+    df["MACD"], df["MACD Signal Line"], df["MACD Histogram"] = MACD_values(df["Close"], small_ema, large_ema, signal_line,
+                                                                            smoothing)
     
     return df
 
@@ -91,9 +411,7 @@ def Bollinger_Bands(df, period=50, n_deviations=2):
     Bollinger Band is an indicator that creates SMA and keeps price action bounded by upper and lower bands that
     sit n_deviations away from the SMA line"""
     
-    df["SMA"] = df["Close"].rolling(window=period).mean()
-    df["Upper Band"] = df["SMA"] + (df["Close"].rolling(window=period).std()*n_deviations)
-    df["Lower Band"] = df["SMA"] - (df["Close"].rolling(window=period).std()*n_deviations)
+    df["SMA"], df["Upper Band"], df["Lower Band"] = Bollinger_Bands_values(df["Close"], period, n_deviations)
     
     return df
 
@@ -107,34 +425,7 @@ def RSI(df, period=14):
     RSI is a momentum indicator that measures the magnitude of recent price changes to evaluate overbought or oversold
     conditions"""
     
-    rsi_df = pd.DataFrame(index=df.index, columns=["U", "D", "U SMMA", "D SMMA", "RS", "RSI"])
-    
-    for i in range(1, len(df)):
-        if df["Close"].iloc[i]>=df["Close"].iloc[i-1]:
-            #U
-            rsi_df.iloc[i, 0] = df["Close"].iloc[i] - df["Close"].iloc[i-1]
-            #D
-            rsi_df.iloc[i, 1] = 0
-        else:
-            #U
-            rsi_df.iloc[i, 0] = 0
-            #D
-            rsi_df.iloc[i, 1] = df["Close"].iloc[i-1] - df["Close"].iloc[i]
-    
-    #U SMMA
-    rsi_df.iloc[period, 2] = rsi_df["U"].iloc[1:period+1].mean()
-    #D SMMA
-    rsi_df.iloc[period, 3] = rsi_df["D"].iloc[1:period+1].mean()
-    for i in range(period+1, len(df)):
-        #U SMMA
-        rsi_df.iloc[i, 2] = (rsi_df["U SMMA"].iloc[i-1]*(period-1) + rsi_df["U"].iloc[i])/period
-        #D SMMA
-        rsi_df.iloc[i, 3] = (rsi_df["D SMMA"].iloc[i-1]*(period-1) + rsi_df["D"].iloc[i])/period
-    
-    rsi_df["RS"] = rsi_df["U SMMA"]/rsi_df["D SMMA"]
-    rsi_df["RSI"] = 100 - 100/(1+rsi_df["RS"])
-    
-    df["RSI"] = rsi_df["RSI"]
+    df["RSI"] = RSI_values(df["Close"], period)
     
     return df
 
@@ -147,70 +438,111 @@ def ADX(df, period=14):
     """Intakes a price dataframe and returns +DI, -DI and ADX columns
     ADX is an indicator that describes the relative strength of the trend"""
     
-    adx_df = pd.DataFrame(index=df.index, columns=["+DM", "-DM", "TR", "ATR", "+DM SMMA", "-DM SMMA", "+DI", "-DI",
-                                                   "Abs(+DI--DI)", "ADX"])
-    
-    for i in range(1, len(df)):
-        up_move = df["High"].iloc[i] - df["High"].iloc[i-1]
-        down_move = df["Low"].iloc[i-1] - df["Low"].iloc[i]
-        if (up_move > down_move) and (up_move > 0):
-            adx_df["+DM"].iloc[i] = up_move
-        else:
-            adx_df["+DM"].iloc[i] = 0
-        if (down_move > up_move) and (down_move > 0):
-            adx_df["-DM"].iloc[i] = down_move
-        else:
-            adx_df["-DM"].iloc[i] = 0
-    
-    for i in range(1, len(df)):
-        adx_df["TR"].iloc[i] = (max(df["High"].iloc[i], df["Close"].iloc[i-1])
-                                  - min(df["Low"].iloc[i], df["Close"].iloc[i-1]))
-    
-    adx_df["ATR"].iloc[period-1] = adx_df["TR"].iloc[0:period].mean()
-    for i in range(period, len(adx_df)):
-        adx_df["ATR"].iloc[i] = (adx_df["ATR"].iloc[i-1]*(period-1) + adx_df["TR"].iloc[i])/period
-    
-    adx_df["+DM SMMA"].iloc[period] = adx_df["+DM"].iloc[1:period+1].mean()
-    adx_df["-DM SMMA"].iloc[period] = adx_df["-DM"].iloc[1:period+1].mean()
-    for i in range(period+1, len(df)):
-        adx_df["+DM SMMA"].iloc[i] = (adx_df["+DM SMMA"].iloc[i-1]*(period-1) + adx_df["+DM"].iloc[i])/period
-        adx_df["-DM SMMA"].iloc[i] = (adx_df["-DM SMMA"].iloc[i-1]*(period-1) + adx_df["-DM"].iloc[i])/period
-    adx_df["+DI"] = adx_df["+DM SMMA"]*(100/adx_df["ATR"])
-    adx_df["-DI"] = adx_df["-DM SMMA"]*(100/adx_df["ATR"])
-    
-    adx_df["Abs(+DI--DI)"] = abs(adx_df["+DI"]-adx_df["-DI"])
-    adx_df["ADX"].iloc[2*period] = adx_df["Abs(+DI--DI)"].iloc[period:2*period+1].mean()
-    for i in range(2*period+1, len(adx_df)):
-        adx_df["ADX"].iloc[i] = (adx_df["ADX"].iloc[i-1]*(period-1) + adx_df["Abs(+DI--DI)"].iloc[i])/period
-    adx_df["ADX"] = adx_df["ADX"]*(100/(adx_df["+DI"]+adx_df["-DI"]))
-    
-    df["+DI"] = adx_df["+DI"]
-    df["-DI"] = adx_df["-DI"]
-    df["ADX"] = adx_df["ADX"]
+    df["+DI"], df["-DI"], df["ADX"] = ADX_values(df["High"], df["Low"], df["Close"], period)
     
     return df
 
 ##########################################################################################################################################################################################################################
 
+#Batch Indicators over Price Panels
+
+def _panel(prices, field="Close"):
+    
+    """Intakes a (time x ticker) price matrix or a price dataframe with (field, ticker) MultiIndex columns and returns the
+    float64 matrix of the requested field; a plain matrix or single-level dataframe is taken to be the Close panel"""
+    
+    if isinstance(prices, pd.DataFrame) and isinstance(prices.columns, pd.MultiIndex):
+        return prices[field].to_numpy(dtype=np.float64)
+    if isinstance(prices, dict):
+        return np.asarray(prices[field], dtype=np.float64)
+    if field!="Close":
+        raise ValueError("{} prices require a MultiIndex dataframe or a dict of price matrices".format(field))
+    return np.asarray(prices, dtype=np.float64)
+
+
+def SMA_batch(prices, period=15, dtype=np.float64):
+    
+    """Intakes a (time x ticker) Close price panel and returns the matrix of SMA values for every ticker"""
+    
+    return SMA_values(_panel(prices), period).astype(dtype, copy=False)
+
+
+def EMA_batch(prices, period=20, smoothing=2, dtype=np.float64):
+    
+    """Intakes a (time x ticker) Close price panel and returns the matrix of EMA values for every ticker"""
+    
+    return EMA_values(_panel(prices), period, smoothing).astype(dtype, copy=False)
+
+
+def Bollinger_Bands_batch(prices, period=50, n_deviations=2, dtype=np.float64):
+    
+    """Intakes a (time x ticker) Close price panel and returns the SMA, Upper Band and Lower Band matrices"""
+    
+    return tuple(values.astype(dtype, copy=False) for values in Bollinger_Bands_values(_panel(prices), period, n_deviations))
+
+
+def RSI_batch(prices, period=14, dtype=np.float64):
+    
+    """Intakes a (time x ticker) Close price panel and returns the matrix of RSI values for every ticker"""
+    
+    return RSI_values(_panel(prices), period).astype(dtype, copy=False)
+
+
+def MACD_batch(prices, small_ema=12, large_ema=26, signal_line=9, smoothing=2, dtype=np.float64):
+    
+    """Intakes a (time x ticker) Close price panel and returns the MACD, MACD Signal Line and MACD Histogram matrices"""
+    
+    return tuple(values.astype(dtype, copy=False)
+                 for values in MACD_values(_panel(prices), small_ema, large_ema, signal_line, smoothing))
+
+
+def ADX_batch(prices, period=14, dtype=np.float64):
+    
+    """Intakes High, Low and Close panels, as a (field, ticker) MultiIndex dataframe or a dict of (time x ticker) matrices,
+    and returns the +DI, -DI and ADX matrices"""
+    
+    return tuple(values.astype(dtype, copy=False)
+                 for values in ADX_values(_panel(prices, "High"), _panel(prices, "Low"), _panel(prices, "Close"), period))
+
+##########################################################################################################################################################################################################################
+
 #Plotting Charts with Technical Indicators
 
 if __name__ == '__main__':
 
+    from plotly.subplots import make_subplots
+    import plotly.graph_objects as go
+    from Price_Store import load_prices
+    from Chart_Rendering import range_slice, downsample_ohlc, downsample_line, render
     #For VSCode
-    price_df = pd.read_csv(r"Trading_Strategies\Algotrading\AAPL_data.csv", index_col="Date")
+    price_df = load_prices(r"Trading_Strategies\Algotrading\AAPL_data.csv")
     #For Jupyter Notebook
-    #price_df = pd.read_csv("AAPL_data.csv", index_col="Date")
+    #price_df = load_prices("AAPL_data.csv")
     price_df.index.name = None
 
+    #Plotted date range (None for the whole series), maximum number of points per trace (None for every bar) and the folder
+    #for static images (None to open the charts in the browser)
+    start = None
+    end = None
+    max_points = 2000
+    image_dir = None
+
+    #The recursive indicators depend on the whole history before start, so they are computed on the bars up to end only
+    window, offset = range_slice(price_df.index, start, end, lookback=len(price_df))
+    price_df = price_df.iloc[window]
+    candles = downsample_ohlc(price_df.iloc[offset:], max_points)
+    plotted = lambda column: downsample_line(price_df[column].iloc[offset:], max_points)
+    image_path = lambda name: None if image_dir is None else "{}/{}.png".format(image_dir, name)
+
 
 
     #Plotting Japanese Candlestick Chart
 
-    fig = go.Figure(data=go.Candlestick(x = price_df.index, open = price_df["Open"], high = price_df["High"], low = price_df["Low"], close = price_df["Close"], name="Candlestick"))
+    fig = go.Figure(data=go.Candlestick(x = candles.index, open = candles["Open"], high = candles["High"], low = candles["Low"], close = candles["Close"], name="Candlestick"))
     fig.update_layout(xaxis_rangeslider_visible=False)
     fig.update_layout(title="Candlestick Chart", yaxis_title="Stock Price", xaxis_title="Date")
 
-    fig.show()
+    render(fig, image_path("Candlestick_Chart"))
     
     
     #Plotting RSI
@@ -218,29 +550,32 @@ if __name__ == '__main__':
     price_df = RSI(price_df)
     oversold = 30
     overbought = 70
+    rsi = plotted("RSI")
+    range_ends = [price_df.index[offset], price_df.index[-1]]
 
-    fig = go.Figure(go.Scatter(x = price_df.index, y = overbought*np.ones(len(price_df)), line_color = "green", name = "Overbought Condition"), layout = {"height":303})
-    fig.add_trace(go.Scatter(x = price_df.index, y = oversold*np.ones(len(price_df)), line_color = "red", name = "Oversold Condition"))
-    fig.add_trace(go.Scatter(x = price_df.index, y = price_df["RSI"], line_color = "blue", name = "RSI"))
+    fig = go.Figure(go.Scatter(x = range_ends, y = [overbought, overbought], line_color = "green", name = "Overbought Condition"), layout = {"height":303})
+    fig.add_trace(go.Scatter(x = range_ends, y = [oversold, oversold], line_color = "red", name = "Oversold Condition"))
+    fig.add_trace(go.Scatter(x = rsi.index, y = rsi, line_color = "blue", name = "RSI"))
 
     fig.update_layout(title="RSI", yaxis_title="RSI Value", xaxis_title="Date")
 
-    fig.show()
+    render(fig, image_path("RSI"))
 
 
     #Plotting Candlestick Chart and MACD
 
     price_df = EMA(price_df)
     price_df = MACD(price_df)
+    ema, macd, signal_line, histogram = plotted("20 EMA"), plotted("MACD"), plotted("MACD Signal Line"), plotted("MACD Histogram")
 
     fig = make_subplots(rows=2, cols=1, shared_xaxes=True, shared_yaxes=False, row_heights=[0.8, 0.2], subplot_titles=["Candlestick Chart", "MACD"])
 
-    fig.add_trace(go.Candlestick(x = price_df.index, open = price_df["Open"], high = price_df["High"], low = price_df["Low"], close = price_df["Close"], name="Candlestick"), row=1, col=1)
-    fig.add_trace(go.Scatter(x = price_df.index, y = price_df["20 EMA"], line_color = "blue", name = "20 EMA"), row=1, col=1)
+    fig.add_trace(go.Candlestick(x = candles.index, open = candles["Open"], high = candles["High"], low = candles["Low"], close = candles["Close"], name="Candlestick"), row=1, col=1)
+    fig.add_trace(go.Scatter(x = ema.index, y = ema, line_color = "blue", name = "20 EMA"), row=1, col=1)
     fig.update_layout(xaxis_rangeslider_visible=False)
 
-    fig.add_trace(go.Scatter(x = price_df.index, y = price_df["MACD"], line_color = "blue", name = "MACD"), row=2, col=1)
-    fig.add_trace(go.Scatter(x = price_df.index, y = price_df["MACD Signal Line"], line_color = "red", name = "MACD Signal Line"), row=2, col=1)
-    fig.add_trace(go.Bar(x = price_df.index, y = price_df["MACD Histogram"], name = "MACD Histogram"), row=2, col=1)
+    fig.add_trace(go.Scatter(x = macd.index, y = macd, line_color = "blue", name = "MACD"), row=2, col=1)
+    fig.add_trace(go.Scatter(x = signal_line.index, y = signal_line, line_color = "red", name = "MACD Signal Line"), row=2, col=1)
+    fig.add_trace(go.Bar(x = histogram.index, y = histogram, name = "MACD Histogram"), row=2, col=1)
 
-    fig.show()
+    render(fig, image_path("Candlestick_Chart_and_MACD"))
\ No newline at end of file
@@ -0,0 +1,179 @@
+import numpy as np
+import pandas as pd
+
+##########################################################################################################################################################################################################################
+
+#Typed Trade Ledger
+
+LEDGER_COLUMNS = ["Side", "Entry Price", "Closing Price", "Opened on", "Closed on", "Number of Shares", "Total Investment",
+                  "Profit/Loss"]
+
+
+def index_times(index):
+
+    """Intakes a price index and returns the timestamps a ledger records for its bars: the datetime64[ns] values of a
+    DatetimeIndex, the int64 labels of an integer index, or the bar positions for any other index"""
+
+    if isinstance(index, pd.DatetimeIndex):
+        return index.to_numpy(dtype="datetime64[ns]")
+    if pd.api.types.is_integer_dtype(index.dtype):
+        return index.to_numpy(dtype=np.int64)
+    return np.arange(len(index), dtype=np.int64)
+
+
+def _open_time(time_dtype):
+
+    """Returns the Closed on placeholder of open trades: NaT for dates and -1 for integer labels"""
+
+    return np.datetime64("NaT", "ns") if np.dtype(time_dtype).kind=="M" else -1
+
+
+class Trade_Ledger:
+
+    """Columnar record of trades with typed NumPy columns: Side as int8 (+1 Buy, -1 Sell), Entry Price, Closing Price, Total
+    Investment and Profit/Loss as float64, Number of Shares as int64, and Opened on / Closed on as datetime64[ns] (or as the
+    int64 index labels when the prices are not indexed by dates). Open trades carry NaN in Closing Price and Profit/Loss and
+    NaT (or -1) in Closed on. A trade takes 57 bytes, so a million trades fit in about 57 MB.
+    Columns are read with ledger["Profit/Loss"] and are views of the first len(ledger) rows; append grows the storage by
+    doubling, so appending one trade at a time stays amortized O(1).
+    Ledgers returned by strategy_engine also keep bar_positions, the int64 arrays of the opening and closing bar of every
+    trade (-1 while open), which locate the trades exactly even when the index is unsorted or repeats timestamps; it is
+    None for other ledgers and is dropped once the ledger is modified."""
+
+    def __init__(self, capacity=0, time_dtype="datetime64[ns]"):
+        self.time_dtype = np.dtype(time_dtype)
+        self.n_trades = 0
+        self.columns = self._allocate(capacity)
+        self.bar_positions = None
+
+    def _allocate(self, capacity):
+        return {"Side": np.zeros(capacity, dtype=np.int8),
+                "Entry Price": np.empty(capacity, dtype=np.float64),
+                "Closing Price": np.full(capacity, np.nan, dtype=np.float64),
+                "Opened on": np.empty(capacity, dtype=self.time_dtype),
+                "Closed on": np.full(capacity, _open_time(self.time_dtype), dtype=self.time_dtype),
+                "Number of Shares": np.empty(capacity, dtype=np.int64),
+                "Total Investment": np.empty(capacity, dtype=np.float64),
+                "Profit/Loss": np.full(capacity, np.nan, dtype=np.float64)}
+
+    def _reserve(self, n_new):
+        capacity = len(self.columns["Side"])
+        if self.n_trades+n_new<=capacity:
+            return
+        grown = self._allocate(max(2*capacity, self.n_trades+n_new, 16))
+        for name, column in self.columns.items():
+            grown[name][:self.n_trades] = column[:self.n_trades]
+        self.columns = grown
+
+    @classmethod
+    def from_arrays(cls, side, entry_price, closing_price, opened_on, closed_on, n_shares, total_investment, profit_loss):
+
+        """Intakes the eight columns as arrays of equal length and returns the ledger holding them, cast to the ledger dtypes
+        (arrays that already have them are used without copying)"""
+
+        opened_on = np.asarray(opened_on)
+        ledger = cls(0, opened_on.dtype if opened_on.dtype.kind=="M" else np.int64)
+        ledger.columns = {"Side": np.asarray(side, dtype=np.int8),
+                          "Entry Price": np.asarray(entry_price, dtype=np.float64),
+                          "Closing Price": np.asarray(closing_price, dtype=np.float64),
+                          "Opened on": np.asarray(opened_on, dtype=ledger.time_dtype),
+                          "Closed on": np.asarray(closed_on, dtype=ledger.time_dtype),
+                          "Number of Shares": np.asarray(n_shares, dtype=np.int64),
+                          "Total Investment": np.asarray(total_investment, dtype=np.float64),
+                          "Profit/Loss": np.asarray(profit_loss, dtype=np.float64)}
+        ledger.n_trades = len(ledger.columns["Side"])
+        if any(len(column)!=ledger.n_trades for column in ledger.columns.values()):
+            raise ValueError("all ledger columns must have the same length")
+        return ledger
+
+    @classmethod
+    def from_bar_positions(cls, side, entry_price, closing_price, opened_bar, closed_bar, n_shares, total_investment,
+                           profit_loss, times):
+
+        """Intakes the columns with Opened on and Closed on given as bar positions (-1 while open) and the index_times of the
+        prices; returns the ledger with the bar timestamps"""
+
+        opened_bar = np.asarray(opened_bar, dtype=np.int64)
+        closed_bar = np.asarray(closed_bar, dtype=np.int64)
+        closed_on = np.full(len(closed_bar), _open_time(times.dtype), dtype=times.dtype)
+        closed_on[closed_bar>=0] = times[closed_bar[closed_bar>=0]]
+        ledger = cls.from_arrays(side, entry_price, closing_price, times[opened_bar], closed_on, n_shares, total_investment,
+                                 profit_loss)
+        ledger.bar_positions = (opened_bar, closed_bar)
+        return ledger
+
+    def append(self, side, entry_price, opened_on, n_shares, total_investment):
+
+        """Records one new open trade and returns its row number"""
+
+        self._reserve(1)
+        self.bar_positions = None
+        row = self.n_trades
+        self.columns["Side"][row] = side
+        self.columns["Entry Price"][row] = entry_price
+        self.columns["Opened on"][row] = opened_on
+        self.columns["Number of Shares"][row] = n_shares
+        self.columns["Total Investment"][row] = total_investment
+        self.n_trades = row+1
+        return row
+
+    def extend(self, side, entry_price, opened_on, n_shares, total_investment):
+
+        """Records several new open trades given as arrays (or scalars broadcast to them) in one step"""
+
+        side = np.atleast_1d(side)
+        self._reserve(len(side))
+        self.bar_positions = None
+        rows = slice(self.n_trades, self.n_trades+len(side))
+        self.columns["Side"][rows] = side
+        self.columns["Entry Price"][rows] = entry_price
+        self.columns["Opened on"][rows] = opened_on
+        self.columns["Number of Shares"][rows] = n_shares
+        self.columns["Total Investment"][rows] = total_investment
+        self.n_trades = rows.stop
+
+    def close(self, rows, closing_price, closed_on):
+
+        """Closes the trades at rows (a row number, a slice or an array of them) at closing_price and closed_on, and
+        computes their Profit/Loss: long trades gain and short trades lose when the price rises above the entry"""
+
+        self.bar_positions = None
+        self.columns["Closing Price"][rows] = closing_price
+        self.columns["Closed on"][rows] = closed_on
+        self.columns["Profit/Loss"][rows] = self.columns["Side"][rows]*(self.columns["Closing Price"][rows]
+                                                                         *self.columns["Number of Shares"][rows]
+                                                                         - self.columns["Total Investment"][rows])
+
+    def __len__(self):
+        return self.n_trades
+
+    def __getitem__(self, name):
+        return self.columns[name][:self.n_trades]
+
+    def is_open(self):
+
+        """Returns the boolean array of the trades that are still open"""
+
+        closed_on = self["Closed on"]
+        return np.isnat(closed_on) if closed_on.dtype.kind=="M" else closed_on<0
+
+    @property
+    def nbytes(self):
+
+        """Number of bytes taken by the recorded trades"""
+
+        return sum(self[name].nbytes for name in LEDGER_COLUMNS)
+
+    def to_pandas(self, copy=False):
+
+        """Returns the trades as a dataframe with the typed ledger columns; without copy the columns share memory with the
+        ledger wherever pandas allows it"""
+
+        return pd.DataFrame({name: self[name] for name in LEDGER_COLUMNS}, columns=LEDGER_COLUMNS, copy=copy)
+
+    def to_arrow(self):
+
+        """Returns the trades as a pyarrow Table (needs the pyarrow package); the NaN and NaT of open trades become nulls"""
+
+        import pyarrow as pa
+        return pa.table({name: pa.array(self[name], from_pandas=True) for name in LEDGER_COLUMNS})
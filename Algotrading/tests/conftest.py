@@ -0,0 +1,19 @@
+import os
+import sys
+import pandas as pd
+import pytest
+
+#The Algotrading modules import each other as top-level modules, so their folder goes on the path
+ALGOTRADING_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ALGOTRADING_DIR)
+
+
+@pytest.fixture(scope="session")
+def aapl():
+
+    """Returns AAPL_data.csv as a writable price dataframe indexed by date"""
+
+    price_df = pd.read_csv(os.path.join(ALGOTRADING_DIR, "AAPL_data.csv"), index_col="Date", parse_dates=True)
+    price_df.index.name = None
+    return price_df
+
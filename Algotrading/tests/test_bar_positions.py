@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+from Bollinger_Bands import boll_buy_lower_sell_upper
+from Hackathon_Engine import Hackathon_Simulation
+from Indicator_Cache import default_cache
+from Performance_Metrics import engine_metrics
+from Strategy_Engine import strategy_engine
+
+#Trades are booked on the bar positions the engine records, so relabelling the bars must not move any P/L
+RELABELLINGS = {"reversed": lambda index: index[::-1],
+                "duplicated": lambda index: index[np.arange(len(index))//2]}
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    default_cache.clear()
+
+
+@pytest.mark.parametrize("relabel", list(RELABELLINGS))
+def test_simulation_ignores_the_index_order(aapl, relabel, capsys):
+    strategy = boll_buy_lower_sell_upper(aapl.copy(), encoded=True)
+    relabelled = aapl.set_axis(RELABELLINGS[relabel](aapl.index))
+
+    equity, summary = Hackathon_Simulation(aapl, [strategy], ["Bollinger Bands"], 100000, [0.01], [0.1], equity_curve=True)
+    default_cache.clear()
+    relabelled_equity, relabelled_summary = Hackathon_Simulation(relabelled, [strategy], ["Bollinger Bands"], 100000, [0.01],
+                                                                 [0.1], equity_curve=True)
+
+    np.testing.assert_array_equal(relabelled_equity, equity)
+    pd.testing.assert_frame_equal(relabelled_summary, summary)
+
+
+@pytest.mark.parametrize("relabel", list(RELABELLINGS))
+def test_engine_metrics_ignore_the_index_order(aapl, relabel, capsys):
+    strategy = boll_buy_lower_sell_upper(aapl.copy(), encoded=True)
+    relabelled = aapl.set_axis(RELABELLINGS[relabel](aapl.index))
+
+    trades = strategy_engine(aapl, strategy, 100000, 0.01, 0.1, ledger=True)
+    relabelled_trades = strategy_engine(relabelled, strategy, 100000, 0.01, 0.1, ledger=True)
+
+    pd.testing.assert_series_equal(engine_metrics(relabelled_trades, relabelled, 100000), engine_metrics(trades, aapl, 100000))
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+from Bar_Resampler import BAR_COLUMNS, load_bars
+
+
+def ticks(sizes):
+
+    """One tick per second from the open, priced 10, 11, 12, ... with the given sizes"""
+
+    return pd.DataFrame({"Timestamp": pd.date_range("2024-01-02 09:30", periods=len(sizes), freq="s"),
+                         "Price": 10.0+np.arange(len(sizes)), "Size": sizes})
+
+
+def irregular_ticks(n_ticks=300, seed=0):
+
+    """Ticks at random times over about 25 minutes, with a ten-minute gap that leaves minutes without any tick"""
+
+    rng = np.random.default_rng(seed)
+    seconds = np.sort(rng.uniform(0, 900, n_ticks))
+    seconds[n_ticks//2:] = seconds[n_ticks//2:]+600
+    return pd.DataFrame({"Timestamp": pd.Timestamp("2024-01-02 09:30")+pd.to_timedelta(seconds, unit="s"),
+                         "Price": np.round(100+np.cumsum(rng.normal(0, 0.05, n_ticks)), 2),
+                         "Size": rng.integers(1, 500, n_ticks).astype(np.float64)})
+
+
+def chunked(tick_df, chunksize):
+    return [tick_df.iloc[start:start+chunksize] for start in range(0, len(tick_df), chunksize)]
+
+
+@pytest.mark.parametrize("chunksize", [1, 2, 4, 6])
+def test_volume_bars_end_on_the_tick_that_completes_them(chunksize):
+    #Six 60-share ticks with bar_size 100: every second tick takes its bar to 120 shares and closes it
+    bars = load_bars(chunked(ticks([60]*6), chunksize), 100, by="volume")
+
+    assert bars["Volume"].tolist()==[120, 120, 120]
+    assert bars["Open"].tolist()==[10, 12, 14] and bars["Close"].tolist()==[11, 13, 15]
+    assert list(bars.index)==list(ticks([60]*6)["Timestamp"][::2])
+
+
+@pytest.mark.parametrize("chunksize", [1, 3, 7])
+def test_volume_bars_start_empty_after_an_overshoot(chunksize):
+    #The 250-share tick closes a bar on its own; the last bar is still unfinished when the ticks run out
+    bars = load_bars(chunked(ticks([30, 250, 100, 40, 40, 40, 10]), chunksize), 100, by="volume")
+
+    assert bars["Volume"].tolist()==[280, 100, 120, 10]
+    assert bars["High"].tolist()==[11, 12, 15, 16] and bars["Low"].tolist()==[10, 12, 13, 16]
+
+
+@pytest.mark.parametrize("chunksize", [1, 7, 64, 1000])
+def test_time_bars_match_pandas_resample(tmp_path, chunksize):
+    tick_df = irregular_ticks()
+    tick_df.to_csv(tmp_path/"ticks.csv", index=False)
+
+    bars = load_bars(str(tmp_path/"ticks.csv"), "1min", chunksize=chunksize)
+
+    expected = tick_df.set_index("Timestamp").resample("1min").agg(High=("Price", "max"), Low=("Price", "min"),
+                                                                   Open=("Price", "first"), Close=("Price", "last"),
+                                                                   Volume=("Size", "sum"), Adj_Close=("Price", "last"))
+    #Minutes without ticks give no bar
+    expected = expected.dropna().set_axis(BAR_COLUMNS, axis=1).rename_axis(None)
+    assert len(expected)<expected.index[-1].minute-expected.index[0].minute+1
+    pd.testing.assert_frame_equal(bars, expected, check_freq=False)
@@ -0,0 +1,10 @@
+import pytest
+from Benchmarks import DEFERRED_MODULES, HEADLESS_MODULES, IMPORT_BUDGET, cold_start
+
+
+@pytest.mark.parametrize("module", HEADLESS_MODULES)
+def test_headless_import_stays_light(module):
+    seconds, loaded = cold_start(module, repeats=2)
+
+    assert loaded==[], "importing {} loaded {} (deferred: {})".format(module, ", ".join(loaded), ", ".join(DEFERRED_MODULES))
+    assert seconds<=IMPORT_BUDGET
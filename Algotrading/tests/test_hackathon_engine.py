@@ -0,0 +1,127 @@
+import itertools
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+import pytest
+from Bollinger_Bands import boll_buy_lower_sell_upper
+from Golden_Cross_Death_Cross import golden_cross_death_cross
+from Hackathon_Engine import Hackathon_Simulation, Hackathon_Sweep, Hackathon_Walk_Forward, walk_forward_folds
+from Indicator_Cache import default_cache
+from Performance_Metrics import ENGINE_METRIC_COLUMNS, engine_metrics
+from Strategy_Engine import encode_signals, strategy_engine
+
+PARAM_GRID = {"sma_number": [20, 50], "n_deviations": [1, 2], "risk_per_trade": [0.01, 0.05]}
+
+
+def grid_combinations(param_grid):
+    names = list(param_grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(param_grid[name] for name in names))]
+
+
+def serial_metrics(price_df, signals, risk_per_trade, start=0, stop=None):
+
+    """engine_metrics of one backtest of the bars [start, stop), run in this process"""
+
+    price_df = pd.DataFrame({"Close": price_df["Close"].to_numpy()[start:stop]})
+    trades = strategy_engine(price_df, signals[start:stop], 100000, risk_per_trade, 0.1, close_positions=True, ledger=True)
+    return engine_metrics(trades, price_df, 100000)
+
+
+class Recording_Shared_Memory(shared_memory.SharedMemory):
+
+    """SharedMemory that records the names of the blocks it creates"""
+
+    created = []
+
+    def __init__(self, name=None, create=False, size=0):
+        super().__init__(name, create, size)
+        if create:
+            Recording_Shared_Memory.created.append(self.name)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    default_cache.clear()
+
+
+@pytest.fixture
+def recorded_blocks(monkeypatch):
+    Recording_Shared_Memory.created = []
+    monkeypatch.setattr(shared_memory, "SharedMemory", Recording_Shared_Memory)
+    yield Recording_Shared_Memory.created
+    for name in Recording_Shared_Memory.created:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+
+def test_simulation_summary_is_engine_metrics(aapl, capsys):
+    strat_list = [boll_buy_lower_sell_upper(aapl.copy()), golden_cross_death_cross(aapl.copy())]
+    equity, summary = Hackathon_Simulation(aapl, strat_list, ["Bollinger Bands", "Golden Cross - Death Cross"], 100000,
+                                           [0.01, 0.1], [0.1, 1], equity_curve=True)
+
+    assert list(summary.columns)==ENGINE_METRIC_COLUMNS
+    for i, (strategy, risk_per_trade, total_accepted_risk) in enumerate(zip(strat_list, [0.01, 0.1], [0.1, 1])):
+        trades = strategy_engine(aapl, strategy, 100000, risk_per_trade, total_accepted_risk, close_positions=True,
+                                 ledger=True)
+        expected = engine_metrics(trades, aapl, 100000)
+        np.testing.assert_array_equal(summary.to_numpy(dtype=np.float64)[i], expected.to_numpy(dtype=np.float64))
+        assert equity[-1, i]==expected["Final Balance"]
+    #One drawdown definition: the largest fall from the running equity peak as a fraction of that peak
+    peak = np.maximum(np.maximum.accumulate(equity, axis=0), 100000)
+    np.testing.assert_allclose(summary["Max Drawdown"], ((peak-equity)/peak).max(axis=0), rtol=1e-12)
+
+
+def test_repeated_simulations_print_the_engine_output(aapl, capsys):
+    strategy = boll_buy_lower_sell_upper(aapl.copy())
+    outputs = []
+    for _ in range(2):
+        Hackathon_Simulation(aapl, [strategy], ["Bollinger Bands"], 100000, [0.01], [0.1])
+        outputs.append(capsys.readouterr().out)
+    assert outputs[0]==outputs[1]
+    assert "Total account value:" in outputs[1] and "Completed:  Bollinger Bands" in outputs[1]
+
+
+def test_sweep_matches_a_serial_loop(aapl, recorded_blocks, capsys):
+    sweep_df = Hackathon_Sweep(aapl, boll_buy_lower_sell_upper, PARAM_GRID, 100000, metric="Sharpe Ratio", max_workers=2)
+
+    rows = []
+    for params in grid_combinations(PARAM_GRID):
+        signals = boll_buy_lower_sell_upper(aapl.copy(), params["sma_number"], params["n_deviations"], encoded=True)
+        rows.append({**params, **serial_metrics(aapl, signals, params["risk_per_trade"]).to_dict()})
+    expected = pd.DataFrame(rows).sort_values("Sharpe Ratio", ascending=False, kind="mergesort").reset_index(drop=True)
+    expected["Number of Trades"] = expected["Number of Trades"].astype(np.int64)
+
+    pd.testing.assert_frame_equal(sweep_df, expected)
+    assert len(recorded_blocks)==1
+
+
+def test_walk_forward_matches_a_serial_loop(aapl, recorded_blocks, capsys):
+    fold_df = Hackathon_Walk_Forward(aapl, boll_buy_lower_sell_upper, PARAM_GRID, 100000, 1000, 500, metric="Sharpe Ratio",
+                                     max_workers=2)
+
+    combinations = grid_combinations(PARAM_GRID)
+    signals = [encode_signals(boll_buy_lower_sell_upper(aapl.copy(), params["sma_number"], params["n_deviations"]))
+               for params in combinations]
+    folds = walk_forward_folds(len(aapl), 1000, 500)
+    assert len(fold_df)==len(folds)
+    for row, (train_start, train_end, test_start, test_end) in zip(fold_df.itertuples(index=False), folds):
+        in_sample = [serial_metrics(aapl, signals[j], params["risk_per_trade"], train_start, train_end)["Sharpe Ratio"]
+                     for j, params in enumerate(combinations)]
+        chosen = int(np.argmax(np.where(np.isnan(in_sample), -np.inf, in_sample)))
+        out_of_sample = serial_metrics(aapl, signals[chosen], combinations[chosen]["risk_per_trade"], test_start, test_end)
+
+        assert row[:4]==(aapl.index[train_start], aapl.index[train_end-1], aapl.index[test_start], aapl.index[test_end-1])
+        assert dict(zip(PARAM_GRID, row[4:7]))==combinations[chosen]
+        assert row[7]==in_sample[chosen]
+        np.testing.assert_array_equal(np.array(row[8:], dtype=np.float64), out_of_sample.to_numpy(dtype=np.float64))
+    assert len(recorded_blocks)==2
+
+
+def test_shared_memory_is_unlinked_when_a_worker_fails(aapl, recorded_blocks):
+    #A risk_per_trade of None makes the engine raise a TypeError inside the workers
+    param_grid = {"sma_number": [20], "risk_per_trade": [None]}
+    with pytest.raises(TypeError):
+        Hackathon_Sweep(aapl, boll_buy_lower_sell_upper, param_grid, 100000, max_workers=2)
+    with pytest.raises(TypeError):
+        Hackathon_Walk_Forward(aapl, boll_buy_lower_sell_upper, param_grid, 100000, 1000, 500, max_workers=2)
+    assert len(recorded_blocks)==3
@@ -0,0 +1,79 @@
+import os
+import numpy as np
+import pytest
+from Indicator_Cache import Indicator_Cache, fingerprint
+
+
+class Counting_Compute:
+
+    """Compute function that returns a fixed result and counts its calls"""
+
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls = self.calls+1
+        return self.value
+
+
+def test_lru_eviction_keeps_within_the_byte_cap():
+    cache = Indicator_Cache(max_bytes=3*800)
+    data = {name: np.full(100, float(i)) for i, name in enumerate("abcd")}
+    computes = {name: Counting_Compute(values*2) for name, values in data.items()}
+    for name in "abc":
+        cache.get_or_compute("Double", {}, data[name], computes[name])
+    #Reading a moves it to the most recent end, so adding d evicts b
+    cache.get_or_compute("Double", {}, data["a"], computes["a"])
+    cache.get_or_compute("Double", {}, data["d"], computes["d"])
+    assert cache.n_bytes==3*800
+
+    for name in "acd":
+        cache.get_or_compute("Double", {}, data[name], computes[name])
+    assert [computes[name].calls for name in "acd"]==[1, 1, 1]
+    cache.get_or_compute("Double", {}, data["b"], computes["b"])
+    assert computes["b"].calls==2
+    assert cache.n_bytes<=cache.max_bytes
+
+
+def test_results_larger_than_the_cap_are_not_kept():
+    cache = Indicator_Cache(max_bytes=100)
+    compute = Counting_Compute(np.zeros(100))
+    for _ in range(2):
+        cache.get_or_compute("Zeros", {}, np.ones(3), compute)
+    assert compute.calls==2 and cache.n_bytes==0
+
+
+def test_disk_tier_serves_a_new_cache(tmp_path):
+    data = np.arange(50, dtype=np.float64)
+    compute = Counting_Compute((data+1, data-1))
+    Indicator_Cache(cache_dir=str(tmp_path)).get_or_compute("Bands", {"width": 1}, data, compute)
+    assert [name for name in os.listdir(tmp_path) if not name.endswith(".npz")]==[]
+
+    cold_cache = Indicator_Cache(cache_dir=str(tmp_path))
+    upper, lower = cold_cache.get_or_compute("Bands", {"width": 1}, data, compute)
+    assert compute.calls==1 and cold_cache.hits==1
+    np.testing.assert_array_equal(upper, data+1)
+    np.testing.assert_array_equal(lower, data-1)
+    assert not upper.flags.writeable
+    #The disk tier is also used when the memory tier has been emptied
+    cold_cache.clear()
+    cold_cache.get_or_compute("Bands", {"width": 1}, data, compute)
+    assert compute.calls==1
+
+
+def test_changed_inputs_or_parameters_are_recomputed():
+    cache = Indicator_Cache()
+    data = np.linspace(1, 2, 20)
+    compute = Counting_Compute(np.zeros(20))
+    cache.get_or_compute("Mean", {"period": 5}, data, compute)
+    cache.get_or_compute("Mean", {"period": 5}, data.copy(), compute)
+    assert compute.calls==1
+
+    changed = data.copy()
+    changed[7] = np.nextafter(changed[7], 3)
+    for new_data, params in [(changed, {"period": 5}), (data, {"period": 6}), (data.astype(np.float32), {"period": 5}),
+                             (data.reshape(4, 5), {"period": 5})]:
+        cache.get_or_compute("Mean", params, new_data, compute)
+    assert compute.calls==5
+    assert fingerprint(data)!=fingerprint(changed)
@@ -0,0 +1,51 @@
+import os
+import shutil
+import numpy as np
+import pandas as pd
+import pytest
+from Price_Store import convert_csv, load_prices, store_path
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = str(tmp_path/"AAPL_data.csv")
+    shutil.copy(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "AAPL_data.csv"), path)
+    return path
+
+
+def test_store_round_trip(csv_path):
+    expected = pd.read_csv(csv_path, index_col="Date", parse_dates=True)
+    price_df = load_prices(csv_path)
+
+    assert os.path.isdir(store_path(csv_path))
+    pd.testing.assert_frame_equal(price_df, expected.astype(np.float64), check_names=False, check_freq=False)
+    for column in price_df.columns:
+        values = price_df[column].to_numpy()
+        assert isinstance(values.base, np.memmap) or isinstance(values, np.memmap)
+        assert not values.flags.writeable
+
+
+def test_column_subset(csv_path):
+    expected = pd.read_csv(csv_path, index_col="Date", parse_dates=True)
+    price_df = load_prices(csv_path, columns=["Close", "High"])
+
+    assert list(price_df.columns)==["Close", "High"]
+    np.testing.assert_array_equal(price_df["Close"], expected["Close"])
+    with pytest.raises(ValueError):
+        load_prices(csv_path, columns=["Close", "Bid"])
+
+
+def test_rerun_replaces_the_store(csv_path):
+    mapped = load_prices(csv_path)
+    original_close = np.array(mapped["Close"])
+
+    changed = pd.read_csv(csv_path)
+    changed["Close"] = changed["Close"]*2
+    changed.to_csv(csv_path, index=False)
+    convert_csv(csv_path)
+
+    np.testing.assert_array_equal(load_prices(store_path(csv_path))["Close"], pd.read_csv(csv_path)["Close"])
+    #Data mapped before the rerun keeps reading the old files
+    np.testing.assert_array_equal(mapped["Close"], original_close)
+    assert sorted(os.listdir(store_path(csv_path)))==sorted(["index.npy", "meta.json"]+
+                                                           ["column_{}.npy".format(i) for i in range(len(changed.columns)-1)])
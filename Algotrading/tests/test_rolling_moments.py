@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import pytest
+import Technical_Indicators
+from Benchmarks import synthetic_prices
+from Bollinger_Bands import boll_buy_lower_sell_upper
+from Golden_Cross_Death_Cross import golden_cross_death_cross
+from Indicator_Cache import default_cache
+from Streaming_Indicators import (Boll_Buy_Lower_Sell_Upper_Stream, _window_add, _window_mean, _window_remove, _window_reset,
+                                  _window_std)
+from Technical_Indicators import rolling_moments
+
+
+def flat_series():
+
+    """Constant stretches, a tick-rounded ramp and a constant tail of a value that is not exact in binary"""
+
+    return np.concatenate([np.full(300, 101.37), np.round(np.linspace(100, 103, 300), 2), np.full(100, 0.1)])
+
+
+def tick_series():
+
+    """20,000 one-minute closes rounded to the cent, the kind of bars Bar_Resampler builds from ticks"""
+
+    return np.round(synthetic_prices(20000)["Close"].to_numpy(), 2)
+
+
+def baseline_signals(close, sma_number, n_deviations):
+
+    """boll_buy_lower_sell_upper as computed with pandas rolling before the rolling moments primitive"""
+
+    rolling_close = pd.Series(close).rolling(window=sma_number)
+    sma = rolling_close.mean().to_numpy()
+    rolling_std = rolling_close.std().to_numpy()
+    buy = close<=sma-rolling_std*n_deviations
+    sell = ~buy & (close>=sma+rolling_std*n_deviations)
+    return buy.astype(np.int8) - sell.astype(np.int8)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    default_cache.clear()
+
+
+@pytest.mark.parametrize("series", [flat_series, tick_series])
+def test_rolling_moments_match_pandas(series):
+    close = series()
+    means, stds = rolling_moments(close, (2, 3, 5, 50), std=True)
+    for j, window in enumerate((2, 3, 5, 50)):
+        rolling_close = pd.Series(close).rolling(window=window)
+        np.testing.assert_array_equal(means[j], rolling_close.mean().to_numpy())
+        np.testing.assert_array_equal(stds[j], rolling_close.std().to_numpy())
+
+
+def test_flat_windows_have_zero_std():
+    close = flat_series()
+    means, stds = rolling_moments(close, 2, std=True)
+    assert np.all(stds[0][1:300]==0) and np.all(stds[0][-99:]==0)
+    assert np.all(means[0][-99:]==0.1)
+
+
+def test_rolling_moments_of_price_panels():
+    close = np.column_stack([flat_series(), tick_series()[:700]])
+    means = rolling_moments(close, (50, 200))
+    for j, window in enumerate((50, 200)):
+        np.testing.assert_array_equal(means[j], pd.DataFrame(close).rolling(window=window).mean().to_numpy())
+
+
+def test_sweep_matches_pandas(monkeypatch):
+    #The sweep numba compiles, run here as plain Python on prices with gaps and on a panel
+    monkeypatch.setattr(Technical_Indicators, "_rolling_kernel",
+                        Technical_Indicators._rolling_sweep(_window_reset, _window_add, _window_remove, _window_mean,
+                                                            _window_std))
+    close = np.concatenate([flat_series(), tick_series()[:2000]])
+    close[[5, 900, 901, 1500]] = np.nan
+    panel = np.column_stack([close, -close[::-1]])
+    windows = (1, 2, 3, 5, 50)
+    means, stds = Technical_Indicators._rolling_moments(panel, windows, True)
+    for j, window in enumerate(windows):
+        rolling_close = pd.DataFrame(panel).rolling(window=window)
+        np.testing.assert_array_equal(means[j], rolling_close.mean().to_numpy())
+        np.testing.assert_array_equal(stds[j], rolling_close.std().to_numpy())
+
+
+@pytest.mark.parametrize("sma_number, n_deviations", [(2, 1), (3, 1), (5, 1), (5, 2), (50, 2)])
+@pytest.mark.parametrize("series", [flat_series, tick_series])
+def test_band_touch_signals_match_baseline(series, sma_number, n_deviations):
+    close = series()
+    price_df = pd.DataFrame({"Close": close})
+    signals = boll_buy_lower_sell_upper(price_df, sma_number, n_deviations, encoded=True)
+    np.testing.assert_array_equal(signals, baseline_signals(close, sma_number, n_deviations))
+
+    stream = Boll_Buy_Lower_Sell_Upper_Stream(sma_number, n_deviations, encoded=True)
+    np.testing.assert_array_equal([stream.update(value) for value in close], signals)
+
+
+@pytest.mark.parametrize("series", [flat_series, tick_series])
+def test_golden_cross_matches_baseline(series):
+    close = series()
+    large = pd.Series(close).rolling(window=200).mean().to_numpy()
+    small = pd.Series(close).rolling(window=50).mean().to_numpy()
+    golden = (large[:-1]>small[:-1]) & (large[1:]<small[1:])
+    death = (large[:-1]<small[:-1]) & (large[1:]>small[1:])
+    expected = np.concatenate([[0], golden.astype(np.int8) - death.astype(np.int8)])
+
+    np.testing.assert_array_equal(golden_cross_death_cross(pd.DataFrame({"Close": close}), encoded=True), expected)
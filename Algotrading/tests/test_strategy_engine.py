@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+from Bollinger_Bands import boll_buy_lower_sell_upper
+from Golden_Cross_Death_Cross import golden_cross_death_cross
+from Strategy_Engine import portfolio_engine, strategy_engine
+
+STRATEGIES = {"Bollinger Bands": (boll_buy_lower_sell_upper, 0.01, 0.1),
+              "Golden Cross - Death Cross": (golden_cross_death_cross, 0.1, 0.1)}
+
+
+def assert_same_history(fast_history, legacy_history):
+
+    """Asserts that two strategy_engine histories hold the same trades; prices and P/L must be bit-identical"""
+
+    assert list(fast_history.columns)==list(legacy_history.columns)
+    assert len(fast_history)==len(legacy_history)
+    for column in legacy_history.columns:
+        fast = fast_history[column].to_numpy()
+        legacy = legacy_history[column].to_numpy()
+        if column in ("Action", "Opened on", "Closed on"):
+            assert all((a==b) or (pd.isna(a) and pd.isna(b)) for a, b in zip(fast, legacy)), column
+        else:
+            assert np.array_equal(fast.astype(np.float64), legacy.astype(np.float64), equal_nan=True), column
+
+
+#The legacy loop grows its history with DataFrame.append and chained assignments
+@pytest.mark.filterwarnings("ignore:The frame.append method is deprecated:FutureWarning")
+@pytest.mark.filterwarnings("ignore::pandas.errors.SettingWithCopyWarning")
+@pytest.mark.parametrize("close_positions", [True, False])
+@pytest.mark.parametrize("name", list(STRATEGIES))
+def test_fast_engine_matches_legacy_loop(aapl, name, close_positions, capsys):
+    strategy_function, risk_per_trade, total_accepted_risk = STRATEGIES[name]
+    strategy = strategy_function(aapl.copy())
+
+    legacy_history = strategy_engine(aapl, strategy, 100000, risk_per_trade, total_accepted_risk,
+                                     close_positions=close_positions)
+    legacy_output = capsys.readouterr().out
+    fast_history = strategy_engine(aapl, strategy, 100000, risk_per_trade, total_accepted_risk,
+                                   close_positions=close_positions, fast=True)
+    fast_output = capsys.readouterr().out
+
+    assert len(legacy_history)>0
+    assert_same_history(fast_history, legacy_history)
+    assert fast_output==legacy_output
+
+
+#The legacy loop grows its history with DataFrame.append and chained assignments
+@pytest.mark.filterwarnings("ignore:The frame.append method is deprecated:FutureWarning")
+@pytest.mark.filterwarnings("ignore::pandas.errors.SettingWithCopyWarning")
+def test_fast_engine_accepts_encoded_signals(aapl, capsys):
+    strategy = boll_buy_lower_sell_upper(aapl.copy())
+    encoded = boll_buy_lower_sell_upper(aapl.copy(), encoded=True)
+
+    assert_same_history(strategy_engine(aapl, encoded, 100000, 0.01, 0.1, close_positions=True, fast=True),
+                        strategy_engine(aapl, strategy, 100000, 0.01, 0.1, close_positions=True))
+
+
+@pytest.mark.parametrize("close_positions", [True, False])
+@pytest.mark.parametrize("name", list(STRATEGIES))
+def test_portfolio_engine_matches_strategy_engine_for_one_asset(aapl, name, close_positions, capsys):
+    strategy_function, risk_per_trade, total_accepted_risk = STRATEGIES[name]
+    strategy = strategy_function(aapl.copy(), encoded=True)
+
+    history = strategy_engine(aapl, strategy, 100000, risk_per_trade, total_accepted_risk, close_positions=close_positions,
+                              fast=True)
+    portfolio_history = portfolio_engine(aapl[["Close"]], strategy[:, None], 100000, risk_per_trade, total_accepted_risk,
+                                         close_positions=close_positions)
+
+    assert (portfolio_history["Asset"]=="Close").all()
+    assert_same_history(portfolio_history.drop(columns="Asset"), history)
+
+
+def test_portfolio_engine_shares_the_risk_cap_across_assets(capsys):
+    #Each candidate is sized at about half the account: A fills the book to 50%, B would take it to 100% and is rejected,
+    #and the smaller C still fits in the 90% cap because the rejected B reserved nothing
+    price_df = pd.DataFrame({"A": [10.0, 12.0], "B": [10.0, 11.0], "C": [400.0, 410.0]})
+    strategy = np.array([[1, 1, 1], [0, 0, 0]])
+
+    history = portfolio_engine(price_df, strategy, 1000, 0.5, 0.9, close_positions=True)
+
+    assert history["Asset"].tolist()==["A", "C"]
+    assert history["Total Investment"].tolist()==[500.0, 400.0]
+    assert history["Profit/Loss"].tolist()==[100.0, 10.0]
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+import Technical_Indicators
+from Bollinger_Bands import boll_buy_lower_sell_upper
+from Golden_Cross_Death_Cross import golden_cross_death_cross
+from Streaming_Indicators import (ADX_Stream, Bollinger_Bands_Stream, Boll_Buy_Lower_Sell_Upper_Stream, EMA_Stream,
+                                  Golden_Cross_Death_Cross_Stream, MACD_Stream, RSI_Stream, SMA_Stream)
+
+INDICATORS = [(Technical_Indicators.SMA, SMA_Stream, ["15 SMA"]),
+              (Technical_Indicators.EMA, EMA_Stream, ["20 EMA"]),
+              (Technical_Indicators.Bollinger_Bands, Bollinger_Bands_Stream, ["SMA", "Upper Band", "Lower Band"]),
+              (Technical_Indicators.MACD, MACD_Stream, ["MACD", "MACD Signal Line", "MACD Histogram"]),
+              (Technical_Indicators.RSI, RSI_Stream, ["RSI"]),
+              (Technical_Indicators.ADX, ADX_Stream, ["+DI", "-DI", "ADX"])]
+
+
+def replay(stream, price_df, field=None):
+
+    """Feeds price_df to stream one bar at a time, as rows or as the values of one field, and returns the outputs"""
+
+    bars = price_df[field].tolist() if field else price_df.to_dict("records")
+    return [stream.update(bar) for bar in bars]
+
+
+@pytest.mark.parametrize("indicator, stream_class, columns", INDICATORS, ids=[columns[-1] for _, _, columns in INDICATORS])
+def test_indicator_streams_match_batch(aapl, indicator, stream_class, columns):
+    expected = indicator(aapl.copy())[columns].to_numpy(dtype=np.float64)
+    streamed = np.array(replay(stream_class(), aapl), dtype=np.float64).reshape(expected.shape)
+
+    np.testing.assert_array_equal(streamed, expected)
+
+
+@pytest.mark.parametrize("encoded", [False, True])
+def test_golden_cross_stream_matches_batch(aapl, encoded):
+    expected = golden_cross_death_cross(aapl.copy(), encoded=encoded)
+    assert replay(Golden_Cross_Death_Cross_Stream(encoded=encoded), aapl)==list(expected)
+
+
+@pytest.mark.parametrize("encoded", [False, True])
+def test_bollinger_signal_stream_matches_batch(aapl, encoded):
+    expected = boll_buy_lower_sell_upper(aapl.copy(), encoded=encoded)
+    assert replay(Boll_Buy_Lower_Sell_Upper_Stream(encoded=encoded), aapl, "Close")==list(expected)
@@ -0,0 +1,40 @@
+import tracemalloc
+import numpy as np
+import pytest
+from Indicator_Cache import default_cache
+from Technical_Indicators import Bollinger_Bands_values, SMA_values
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    default_cache.clear()
+
+
+@pytest.mark.parametrize("indicator, n_outputs", [(SMA_values, 1), (Bollinger_Bands_values, 3)])
+def test_out_buffer_is_filled_without_caching(aapl, indicator, n_outputs):
+    close = aapl["Close"]
+    out = np.empty((n_outputs, len(close)) if n_outputs>1 else len(close))
+
+    result = indicator(close, 50, out=out)
+    assert default_cache.n_bytes==0
+    expected = indicator(close, 50)
+    assert default_cache.n_bytes>0
+
+    for value, expected_value in zip(np.atleast_2d(out), np.atleast_2d(np.asarray(expected))):
+        np.testing.assert_array_equal(value, expected_value)
+    assert np.shares_memory(np.asarray(result if n_outputs==1 else result[0]), out)
+
+
+@pytest.mark.parametrize("indicator, n_outputs", [(SMA_values, 1), (Bollinger_Bands_values, 3)])
+def test_out_buffer_is_the_only_column(indicator, n_outputs):
+    #Only the compiled sweep writes into out without temporaries; pandas rolling allocates its result and window bounds
+    pytest.importorskip("numba")
+    close = np.round(100+np.cumsum(np.random.default_rng(0).normal(0, 0.1, 100000)), 2)
+    out = np.empty((n_outputs, len(close)) if n_outputs>1 else len(close))
+    indicator(close[:100], 50, out=out[..., :100])
+
+    tracemalloc.start()
+    indicator(close, 50, out=out)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert peak<close.nbytes/10